@@ -0,0 +1,3 @@
+"""
+Gmail MCP Server Vercel Endpoints Package
+"""
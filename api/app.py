@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Gmail MCP Server - ASGI Application for Vercel
+
+Serves the landing page, health check and SSE endpoint from a single
+Starlette app so one worker can handle concurrent requests.
+"""
+import asyncio
+import time
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from api.index import render_page
+from api.health import build_health_body, build_error_body, wants_pretty
+from api.sse import initial_frames, ping_frame, CLOSE_FRAME, STREAM_DURATION, PING_INTERVAL
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, Cache-Control',
+    'Access-Control-Max-Age': '86400',
+}
+
+async def index(request):
+    status, headers, body = render_page(
+        request.headers.get('if-none-match'),
+        request.headers.get('accept-encoding', '')
+    )
+    # Starlette computes Content-Length itself
+    headers = {name: value for name, value in headers if name != 'Content-Length'}
+    return Response(body, status_code=status, headers=headers)
+
+async def health(request):
+    if request.method == 'OPTIONS':
+        return Response(status_code=204, headers=CORS_HEADERS)
+    
+    try:
+        # The Gmail check blocks, so keep it off the event loop
+        body, cache_hit = await run_in_threadpool(build_health_body, wants_pretty(str(request.url)))
+        return Response(body, media_type='application/json', headers={
+            'Access-Control-Allow-Origin': '*',
+            'X-Cache': 'HIT' if cache_hit else 'MISS'
+        })
+    except Exception as e:
+        return Response(build_error_body(e), status_code=500, media_type='application/json', headers={
+            'Access-Control-Allow-Origin': '*'
+        })
+
+async def sse(request):
+    if request.method == 'OPTIONS':
+        return Response(status_code=204, headers=CORS_HEADERS)
+    
+    async def event_stream():
+        frames, ready = initial_frames()
+        yield frames
+        if not ready:
+            return
+        
+        # Keep connection alive until the deadline, then let the client reconnect
+        deadline = time.monotonic() + STREAM_DURATION
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or await request.is_disconnected():
+                break
+            await asyncio.sleep(min(PING_INTERVAL, remaining))
+            yield ping_frame()
+        
+        yield CLOSE_FRAME
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'Connection': 'keep-alive',
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Allow-Headers': 'Cache-Control'
+        }
+    )
+
+app = Starlette(routes=[
+    Route('/', index),
+    Route('/health', health, methods=['GET', 'OPTIONS']),
+    Route('/sse', sse, methods=['GET', 'OPTIONS']),
+])
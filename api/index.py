@@ -3,147 +3,140 @@
 Gmail MCP Server - Web Interface
 """
 from http.server import BaseHTTPRequestHandler
-import json
+import gzip
+import hashlib
+import re
 
-class handler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html')
-        self.end_headers()
+HTML = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Gmail MCP Server</title>
+    <style>
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+            max-width: 800px;
+            margin: 0 auto;
+            padding: 2rem;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            min-height: 100vh;
+        }
+        .container {
+            background: rgba(255, 255, 255, 0.1);
+            backdrop-filter: blur(10px);
+            border-radius: 20px;
+            padding: 2rem;
+            box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
+        }
+        h1 {
+            text-align: center;
+            margin-bottom: 2rem;
+            font-size: 2.5rem;
+            text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.3);
+        }
+        .card {
+            background: rgba(255, 255, 255, 0.1);
+            border-radius: 10px;
+            padding: 1rem;
+        }
+        .status {
+            background: rgba(76, 175, 80, 0.2);
+            border: 1px solid rgba(76, 175, 80, 0.5);
+            margin: 1rem 0;
+            text-align: center;
+        }
+        .endpoint {
+            margin: 1rem 0;
+            border-left: 4px solid #4CAF50;
+        }
+        .endpoint h3 {
+            margin-top: 0;
+            color: #4CAF50;
+        }
+        .code {
+            background: rgba(0, 0, 0, 0.3);
+            border-radius: 5px;
+            padding: 0.5rem;
+            font-family: 'Monaco', 'Menlo', monospace;
+            font-size: 0.9rem;
+            margin: 0.5rem 0;
+            word-break: break-all;
+        }
+        .features {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+            gap: 1rem;
+            margin: 2rem 0;
+        }
+        .feature {
+            text-align: center;
+        }
+        .feature-icon {
+            font-size: 2rem;
+            margin-bottom: 0.5rem;
+        }
+        a {
+            color: #4CAF50;
+            text-decoration: none;
+        }
+        a:hover {
+            text-decoration: underline;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>🚀 Gmail MCP Server</h1>
+        
+        <div class="card status">
+            <h2>✅ Server Status: Online</h2>
+            <p>Your Gmail MCP Server is running and ready to handle requests!</p>
+        </div>
+        
+        <div class="card endpoint">
+            <h3>🔗 MCP Endpoint</h3>
+            <p>Connect your MCP clients to:</p>
+            <div class="code">/sse</div>
+            <p><strong>Full URL:</strong> <a href="/sse" target="_blank">https://your-domain.vercel.app/sse</a></p>
+        </div>
+        
+        <div class="card endpoint">
+            <h3>❤️ Health Check</h3>
+            <p>Monitor server health:</p>
+            <div class="code">/health</div>
+            <p><a href="/health" target="_blank">Check Health Status</a></p>
+        </div>
+        
+        <div class="features">
+            <div class="card feature">
+                <div class="feature-icon">📧</div>
+                <h3>Send Emails</h3>
+                <p>Plain text, HTML, with attachments</p>
+            </div>
+            <div class="card feature">
+                <div class="feature-icon">🔍</div>
+                <h3>Search & Read</h3>
+                <p>Powerful Gmail search and parsing</p>
+            </div>
+            <div class="card feature">
+                <div class="feature-icon">📝</div>
+                <h3>Manage Drafts</h3>
+                <p>Create, update, and send drafts</p>
+            </div>
+            <div class="card feature">
+                <div class="feature-icon">🏷️</div>
+                <h3>Labels & Organization</h3>
+                <p>Manage labels and email organization</p>
+            </div>
+        </div>
         
-        html = """
-        <!DOCTYPE html>
-        <html lang="en">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Gmail MCP Server</title>
-            <style>
-                body {
-                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-                    max-width: 800px;
-                    margin: 0 auto;
-                    padding: 2rem;
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    color: white;
-                    min-height: 100vh;
-                }
-                .container {
-                    background: rgba(255, 255, 255, 0.1);
-                    backdrop-filter: blur(10px);
-                    border-radius: 20px;
-                    padding: 2rem;
-                    box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
-                }
-                h1 {
-                    text-align: center;
-                    margin-bottom: 2rem;
-                    font-size: 2.5rem;
-                    text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.3);
-                }
-                .status {
-                    background: rgba(76, 175, 80, 0.2);
-                    border: 1px solid rgba(76, 175, 80, 0.5);
-                    border-radius: 10px;
-                    padding: 1rem;
-                    margin: 1rem 0;
-                    text-align: center;
-                }
-                .endpoint {
-                    background: rgba(255, 255, 255, 0.1);
-                    border-radius: 10px;
-                    padding: 1rem;
-                    margin: 1rem 0;
-                    border-left: 4px solid #4CAF50;
-                }
-                .endpoint h3 {
-                    margin-top: 0;
-                    color: #4CAF50;
-                }
-                .code {
-                    background: rgba(0, 0, 0, 0.3);
-                    border-radius: 5px;
-                    padding: 0.5rem;
-                    font-family: 'Monaco', 'Menlo', monospace;
-                    font-size: 0.9rem;
-                    margin: 0.5rem 0;
-                    word-break: break-all;
-                }
-                .features {
-                    display: grid;
-                    grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-                    gap: 1rem;
-                    margin: 2rem 0;
-                }
-                .feature {
-                    background: rgba(255, 255, 255, 0.1);
-                    border-radius: 10px;
-                    padding: 1rem;
-                    text-align: center;
-                }
-                .feature-icon {
-                    font-size: 2rem;
-                    margin-bottom: 0.5rem;
-                }
-                a {
-                    color: #4CAF50;
-                    text-decoration: none;
-                }
-                a:hover {
-                    text-decoration: underline;
-                }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>🚀 Gmail MCP Server</h1>
-                
-                <div class="status">
-                    <h2>✅ Server Status: Online</h2>
-                    <p>Your Gmail MCP Server is running and ready to handle requests!</p>
-                </div>
-                
-                <div class="endpoint">
-                    <h3>🔗 MCP Endpoint</h3>
-                    <p>Connect your MCP clients to:</p>
-                    <div class="code">/sse</div>
-                    <p><strong>Full URL:</strong> <a href="/sse" target="_blank">https://your-domain.vercel.app/sse</a></p>
-                </div>
-                
-                <div class="endpoint">
-                    <h3>❤️ Health Check</h3>
-                    <p>Monitor server health:</p>
-                    <div class="code">/health</div>
-                    <p><a href="/health" target="_blank">Check Health Status</a></p>
-                </div>
-                
-                <div class="features">
-                    <div class="feature">
-                        <div class="feature-icon">📧</div>
-                        <h3>Send Emails</h3>
-                        <p>Plain text, HTML, with attachments</p>
-                    </div>
-                    <div class="feature">
-                        <div class="feature-icon">🔍</div>
-                        <h3>Search & Read</h3>
-                        <p>Powerful Gmail search and parsing</p>
-                    </div>
-                    <div class="feature">
-                        <div class="feature-icon">📝</div>
-                        <h3>Manage Drafts</h3>
-                        <p>Create, update, and send drafts</p>
-                    </div>
-                    <div class="feature">
-                        <div class="feature-icon">🏷️</div>
-                        <h3>Labels & Organization</h3>
-                        <p>Manage labels and email organization</p>
-                    </div>
-                </div>
-                
-                <div class="endpoint">
-                    <h3>🔧 Claude Desktop Configuration</h3>
-                    <p>Add this to your Claude Desktop config:</p>
-                    <div class="code">
+        <div class="card endpoint">
+            <h3>🔧 Claude Desktop Configuration</h3>
+            <p>Add this to your Claude Desktop config:</p>
+            <div class="code">
 {
   "mcpServers": {
     "gmail": {
@@ -152,16 +145,115 @@ class handler(BaseHTTPRequestHandler):
     }
   }
 }
-                    </div>
-                </div>
-                
-                <div class="endpoint">
-                    <h3>📚 Documentation</h3>
-                    <p>Visit the <a href="https://github.com/meyannis/mcpgmail" target="_blank">GitHub repository</a> for full documentation and setup instructions.</p>
-                </div>
             </div>
-        </body>
-        </html>
-        """
+        </div>
+        
+        <div class="card endpoint">
+            <h3>📚 Documentation</h3>
+            <p>Visit the <a href="https://github.com/meyannis/mcpgmail" target="_blank">GitHub repository</a> for full documentation and setup instructions.</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+def _minify(html):
+    """Collapse whitespace in the page and strip it from the stylesheet"""
+    def minify_css(match):
+        css = re.sub(r'\s*([{};:,])\s*', r'\1', match.group(2))
+        return match.group(1) + css.replace(';}', '}') + match.group(3)
+    
+    html = re.sub(r'(<style>)(.*?)(</style>)', minify_css, html, flags=re.S)
+    return re.sub(r'\s+', ' ', html).strip()
+
+# Minified and encoded once at import time; gzip variant for clients that accept it
+_HTML_BYTES = _minify(HTML).encode()
+_HTML_GZ = gzip.compress(_HTML_BYTES, 9)
+_ETAG = '"' + hashlib.blake2b(_HTML_BYTES, digest_size=8).hexdigest() + '"'
+# Each representation needs its own validator, or a cache could revalidate
+# one encoding with the other's ETag
+_ETAG_GZ = _ETAG[:-1] + '-gz"'
+
+def _accepts_gzip(accept_encoding):
+    """
+    Check whether an Accept-Encoding header allows a gzip response
+    
+    Args:
+        accept_encoding: Value of the request's Accept-Encoding header
+    
+    Returns:
+        True if gzip (or '*') is listed with a non-zero q-value
+    """
+    qualities = {}
+    for item in (accept_encoding or '').split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    
+    for coding in ('gzip', 'x-gzip', '*'):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+def render_page(if_none_match=None, accept_encoding=''):
+    """
+    Select the landing page response for the given request headers
+    
+    Args:
+        if_none_match: Value of the request's If-None-Match header
+        accept_encoding: Value of the request's Accept-Encoding header
+    
+    Returns:
+        Tuple of (status code, list of header pairs, body bytes)
+    """
+    gzipped = _accepts_gzip(accept_encoding)
+    etag = _ETAG_GZ if gzipped else _ETAG
+    cache_headers = [
+        ('Cache-Control', 'public, max-age=3600'),
+        ('Vary', 'Accept-Encoding'),
+        ('ETag', etag),
+    ]
+    
+    # Client already has the current page in this encoding
+    if if_none_match:
+        tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        if etag in tags or '*' in tags:
+            return 304, cache_headers, b''
+    
+    headers = [('Content-type', 'text/html')] + cache_headers
+    if gzipped:
+        body = _HTML_GZ
+        headers.append(('Content-Encoding', 'gzip'))
+    else:
+        body = _HTML_BYTES
+    headers.append(('Content-Length', str(len(body))))
+    return 200, headers, body
+
+class handler(BaseHTTPRequestHandler):
+    # Every response carries a Content-Length, so connections can be reused
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        status, headers, body = render_page(
+            self.headers.get('If-None-Match'),
+            self.headers.get('Accept-Encoding', '')
+        )
+        
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        if body:
+            self.send_header('Connection', 'keep-alive')
+        self.end_headers()
         
-        self.wfile.write(html.encode())
+        if body:
+            self.wfile.write(body)
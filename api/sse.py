@@ -4,11 +4,79 @@ Gmail MCP Server - SSE Endpoint for Vercel
 """
 from http.server import BaseHTTPRequestHandler
 import json
-import sys
-import os
+import socket
+import time
 
-# Add the parent directory to the path so we can import our modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
+def _dumps(data):
+    """Serialize data to JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode()
+
+# Import the MCP server once per process rather than on every connection
+try:
+    from gmail_server import mcp
+    _IMPORT_ERR = None
+except ImportError as e:
+    mcp = None
+    _IMPORT_ERR = e
+
+SERVER_INFO = {
+    "type": "server_info",
+    "name": "Gmail MCP Server",
+    "version": "1.0.0",
+    "tools": [
+        "send_email",
+        "read_email",
+        "search_emails",
+        "create_email_draft",
+        "get_unread_emails",
+        "manage_labels",
+        "batch_operations"
+    ]
+}
+
+# Static SSE frames, serialized once at import time
+_CONNECTED_FRAME = b'data: ' + _dumps({"type": "connected", "message": "Gmail MCP Server connected"}) + b'\n\n'
+_SERVER_INFO_FRAME = b'data: ' + _dumps(SERVER_INFO) + b'\n\n'
+_READY_FRAME = b'data: ' + _dumps({"type": "ready", "message": "Server ready for MCP connections"}) + b'\n\n'
+
+# Serverless functions have an execution cap, so each connection is held
+# for a bounded time and the client (EventSource) reconnects afterwards
+STREAM_DURATION = 25
+PING_INTERVAL = 5
+_RETRY_FRAME = b'retry: 1000\n\n'
+CLOSE_FRAME = b'event: close\ndata: reconnect\n\n'
+_INITIAL_FRAMES = _RETRY_FRAME + _CONNECTED_FRAME + _SERVER_INFO_FRAME + _READY_FRAME
+
+def initial_frames():
+    """
+    Frames sent as soon as a client connects
+    
+    Returns:
+        Tuple of (frame bytes, whether the server is ready to stream pings)
+    """
+    if _IMPORT_ERR is not None:
+        error_msg = {
+            "type": "error",
+            "message": f"Failed to import Gmail server: {str(_IMPORT_ERR)}"
+        }
+        return _RETRY_FRAME + _CONNECTED_FRAME + b'data: ' + _dumps(error_msg) + b'\n\n', False
+    
+    # For Vercel, we'll run a simplified version
+    # The full MCP server would need to be adapted for serverless
+    return _INITIAL_FRAMES, True
+
+_PING_TMPL = b'data: {"type":"ping","timestamp":%d}\n\n'
+
+def ping_frame():
+    """Keep-alive frame carrying the current timestamp"""
+    return _PING_TMPL % int(time.time())
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
@@ -22,51 +90,32 @@ class handler(BaseHTTPRequestHandler):
             self.send_header('Access-Control-Allow-Headers', 'Cache-Control')
             self.end_headers()
             
-            # Send initial connection event
-            self.wfile.write(b'data: {"type": "connected", "message": "Gmail MCP Server connected"}\n\n')
+            # Pings are tiny; don't let Nagle's algorithm hold them back
+            try:
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError:
+                pass
+            
+            # Send retry directive, connection event, server info and ready
+            # event in a single write
+            frames, ready = initial_frames()
+            self.wfile.write(frames)
             self.wfile.flush()
+            if not ready:
+                return
             
-            # Import and run the MCP server
-            try:
-                from gmail_server import mcp
-                
-                # Send server info
-                server_info = {
-                    "type": "server_info",
-                    "name": "Gmail MCP Server",
-                    "version": "1.0.0",
-                    "tools": [
-                        "send_email",
-                        "read_email", 
-                        "search_emails",
-                        "create_email_draft",
-                        "get_unread_emails",
-                        "manage_labels",
-                        "batch_operations"
-                    ]
-                }
-                self.wfile.write(f'data: {json.dumps(server_info)}\n\n'.encode())
-                self.wfile.flush()
-                
-                # For Vercel, we'll run a simplified version
-                # The full MCP server would need to be adapted for serverless
-                self.wfile.write(b'data: {"type": "ready", "message": "Server ready for MCP connections"}\n\n')
-                self.wfile.flush()
-                
-                # Keep connection alive
-                import time
-                while True:
-                    time.sleep(30)
-                    self.wfile.write(b'data: {"type": "ping", "timestamp": "' + str(int(time.time())).encode() + b'"}\n\n')
-                    self.wfile.flush()
-                    
-            except ImportError as e:
-                error_msg = {
-                    "type": "error",
-                    "message": f"Failed to import Gmail server: {str(e)}"
-                }
-                self.wfile.write(f'data: {json.dumps(error_msg)}\n\n'.encode())
+            # Keep connection alive until the deadline, then let the client reconnect
+            deadline = time.monotonic() + STREAM_DURATION
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(min(PING_INTERVAL, remaining))
+                self.wfile.write(ping_frame())
                 self.wfile.flush()
+            
+            self.wfile.write(CLOSE_FRAME)
+            self.wfile.flush()
                 
         except Exception as e:
             try:
@@ -74,14 +123,15 @@ class handler(BaseHTTPRequestHandler):
                     "type": "error", 
                     "message": f"Server error: {str(e)}"
                 }
-                self.wfile.write(f'data: {json.dumps(error_msg)}\n\n'.encode())
+                self.wfile.write(b'data: ' + _dumps(error_msg) + b'\n\n')
                 self.wfile.flush()
             except:
                 pass
     
     def do_OPTIONS(self):
-        self.send_response(200)
+        self.send_response(204)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type, Cache-Control')
+        self.send_header('Access-Control-Max-Age', '86400')
         self.end_headers()
@@ -18,26 +18,43 @@ License: MIT
 
 import os
 import json
-import base64
 import re
 import logging
 import mimetypes
 from typing import Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.application import MIMEApplication
-from email.mime.image import MIMEImage
-from email.header import decode_header
+from email.header import decode_header, make_header
+from html import unescape
+from email.parser import BytesHeaderParser
+from email.utils import encode_rfc2231, parsedate_to_datetime
 from datetime import datetime, timedelta
 import asyncio
+import functools
 import time
+import uuid
 
 from mcp.server.fastmcp import FastMCP, Context
-from utils.auth import get_gmail_service
+try:
+    # SIMD-accelerated drop-in replacement for the stdlib base64 functions
+    import pybase64 as _b64
+except ImportError:
+    import base64 as _b64
+try:
+    # Faster JSON parser that accepts bytes directly
+    import orjson as _json
+except ImportError:
+    import json as _json
+try:
+    # C-backed HTML parser for extracting text from HTML-only emails
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+# get_gmail_service() returns one shared service (and connection) per process
+from utils.auth import get_gmail_service, thread_authorized_http
 from utils.gmail_api import (
     list_messages,
     get_message,
+    get_messages_batch,
     search_messages,
     create_draft,
     update_draft,
@@ -46,12 +63,19 @@ from utils.gmail_api import (
     get_draft,
     list_drafts,
     get_labels,
+    find_label,
     create_label,
     delete_label,
     apply_label,
+    apply_label_bulk,
     remove_label,
     modify_message,
-    get_profile
+    delete_messages_bulk,
+    get_profile,
+    extract_headers,
+    encode_header,
+    MAX_LINE_LENGTH,
+    MESSAGE_METADATA_FIELDS
 )
 from googleapiclient.errors import HttpError
 
@@ -73,10 +97,18 @@ mcp = FastMCP(
         "google-api-python-client>=2.107.0", 
         "google-auth-httplib2>=0.1.0", 
         "google-auth-oauthlib>=1.1.0",
-        "mcp>=1.5.0"
+        "mcp>=1.10.0",
+        "pybase64>=1.3",
+        "orjson>=3.9.0",
+        "selectolax>=0.3.17"
     ]
 )
 
+@functools.lru_cache(maxsize=256)
+def _guess_mime(ext: str) -> str:
+    """Guess a MIME type from a lowercase file extension such as '.pdf'"""
+    return mimetypes.types_map.get(ext) or mimetypes.guess_type('x' + ext)[0] or 'application/octet-stream'
+
 @dataclass
 class EmailAttachment:
     """Represents an email attachment"""
@@ -88,7 +120,363 @@ class EmailAttachment:
     def __post_init__(self):
         """Set mimetype based on filename if not specified"""
         if not self.mimetype:
-            self.mimetype = mimetypes.guess_type(self.filename)[0] or "application/octet-stream"
+            self.mimetype = _guess_mime(os.path.splitext(self.filename)[1].lower())
+
+# Extra headers for each supported send_email importance level
+_IMPORTANCE_HEADERS = {
+    'high': {'Importance': 'high', 'X-Priority': '1'},
+    'low': {'Importance': 'low', 'X-Priority': '5'},
+}
+
+# Line breaks normalized to CRLF in 7bit text parts
+_LINE_BREAK_RE = re.compile(r'\r\n|\r|\n')
+
+def _encode_text_part(text, subtype):
+    """Build the headers and body of a single text/* MIME part"""
+    # Only real line breaks; str.splitlines() would also split on \f, \v and others
+    lines = _LINE_BREAK_RE.split(text)
+    if text.isascii() and all(len(line) <= MAX_LINE_LENGTH for line in lines):
+        encoding = b'7bit'
+        payload = '\r\n'.join(lines).encode('ascii')
+    else:
+        encoding = b'base64'
+        payload = _b64.encodebytes(text.encode('utf-8')).replace(b'\n', b'\r\n')
+    return (b'Content-Type: text/' + subtype + b'; charset="utf-8"\r\n'
+            b'Content-Transfer-Encoding: ' + encoding + b'\r\n\r\n' + payload)
+
+def _new_boundary():
+    """Generate a MIME boundary that cannot occur in encoded content"""
+    return f"==_Part_{uuid.uuid4().hex}==".encode('ascii')
+
+def _append_body_part(raw, body, html_body=None):
+    """Append the text/plain part, or a multipart/alternative part when HTML is given"""
+    if html_body is None:
+        raw += _encode_text_part(body, b'plain')
+        return
+    
+    boundary = _new_boundary()
+    raw += b'Content-Type: multipart/alternative; boundary="'
+    raw += boundary
+    raw += b'"\r\n\r\n--'
+    raw += boundary
+    raw += b'\r\n'
+    raw += _encode_text_part(body, b'plain')
+    raw += b'\r\n--'
+    raw += boundary
+    raw += b'\r\n'
+    raw += _encode_text_part(html_body, b'html')
+    raw += b'\r\n--'
+    raw += boundary
+    raw += b'--\r\n'
+
+# Read size for attachments; a multiple of 57 bytes so each chunk encodes
+# to whole 76-character base64 lines
+_ATTACHMENT_CHUNK_SIZE = 57 * 1024
+
+def _append_attachment(raw, path):
+    """Append a base64-encoded attachment part for the file at path"""
+    filename = os.path.basename(path)
+    mimetype = _guess_mime(os.path.splitext(filename)[1].lower())
+    if filename.isascii() and '"' not in filename and '\\' not in filename:
+        disposition = f'attachment; filename="{filename}"'
+    else:
+        disposition = f"attachment; filename*={encode_rfc2231(filename, 'utf-8')}"
+    
+    raw += (f'Content-Type: {mimetype}\r\n'
+            f'Content-Transfer-Encoding: base64\r\n'
+            f'Content-Disposition: {disposition}\r\n\r\n').encode('ascii')
+    
+    # Stream the file through the encoder instead of reading it whole
+    with open(path, 'rb') as file:
+        while chunk := file.read(_ATTACHMENT_CHUNK_SIZE):
+            raw += _b64.encodebytes(chunk).replace(b'\n', b'\r\n')
+
+def _build_plain_raw(to, subject, from_email, body):
+    """Assemble a single-part text/plain message with only the required headers"""
+    return (f"To: {encode_header('To', to)}\r\n"
+            f"Subject: {encode_header('Subject', subject)}\r\n"
+            f"From: {encode_header('From', from_email)}\r\n"
+            "MIME-Version: 1.0\r\n").encode('ascii') + _encode_text_part(body, b'plain')
+
+def build_raw_message(to, subject, from_email, body, html_body=None, cc=None, bcc=None,
+                      extra_headers=None, attachment_paths=None):
+    """
+    Assemble an RFC 5322 message directly as bytes
+    
+    Args:
+        to: Email recipient(s)
+        subject: Email subject line
+        from_email: Sender address
+        body: Plain text body
+        html_body: Optional HTML body; produces a multipart/alternative body
+        cc: Optional carbon copy recipient(s)
+        bcc: Optional blind carbon copy recipient(s)
+        extra_headers: Optional dict of additional headers
+        attachment_paths: Optional list of paths of files to attach
+    
+    Returns:
+        The raw message as a bytearray
+    """
+    headers = [('To', to), ('Subject', subject), ('From', from_email)]
+    if cc:
+        headers.append(('Cc', cc))
+    if bcc:
+        headers.append(('Bcc', bcc))
+    if extra_headers:
+        headers.extend(extra_headers.items())
+    
+    raw = bytearray()
+    for name, value in headers:
+        raw += f"{name}: {encode_header(name, value)}\r\n".encode('ascii')
+    raw += b'MIME-Version: 1.0\r\n'
+    
+    if not attachment_paths:
+        _append_body_part(raw, body, html_body)
+        return raw
+    
+    boundary = _new_boundary()
+    delimiter = b'--' + boundary + b'\r\n'
+    raw += b'Content-Type: multipart/mixed; boundary="'
+    raw += boundary
+    raw += b'"\r\n\r\n'
+    raw += delimiter
+    _append_body_part(raw, body, html_body)
+    raw += b'\r\n'
+    for path in attachment_paths:
+        raw += delimiter
+        _append_attachment(raw, path)
+        raw += b'\r\n'
+    raw += b'--'
+    raw += boundary
+    raw += b'--\r\n'
+    return raw
+
+# Authenticated user's address, fetched once per process
+_FROM_EMAIL: Optional[str] = None
+
+def get_from_email(service):
+    """
+    Get the authenticated user's email address for use as the From header
+    
+    Args:
+        service: Gmail API service instance
+    
+    Returns:
+        The user's email address
+    """
+    global _FROM_EMAIL
+    if _FROM_EMAIL is None:
+        profile = get_profile(service)
+        if not profile:
+            # Don't cache a failed lookup
+            return ''
+        _FROM_EMAIL = profile.get('emailAddress', '')
+    return _FROM_EMAIL
+
+def _iter_parts(part):
+    """
+    Walk a message payload's MIME tree depth-first
+    
+    Args:
+        part: Message payload or one of its parts
+    
+    Yields:
+        The part itself followed by all of its nested parts
+    """
+    yield part
+    for child in part.get('parts', ()):
+        yield from _iter_parts(child)
+
+# Cheap sanity gate for RFC 2822 dates so unparseable values skip the exception path
+# (obsolete two-digit years and zone names are left to parsedate_to_datetime)
+_DATE_RE = re.compile(r'^\s*(?:[A-Z][a-z]{2},\s*)?\d{1,2} [A-Z][a-z]{2} \d{2,4} ')
+
+def _format_date(date):
+    """
+    Format an RFC 2822 Date header as 'YYYY-MM-DD HH:MM'
+    
+    Args:
+        date: Raw Date header value
+    
+    Returns:
+        The formatted date, or the original string if it cannot be parsed
+    """
+    if not _DATE_RE.match(date):
+        return date
+    try:
+        return parsedate_to_datetime(date).strftime("%Y-%m-%d %H:%M")
+    except (TypeError, ValueError):
+        return date
+
+def _format_search_row(i, msg):
+    """
+    Format one message of a search listing
+    
+    Args:
+        i: Zero-based position of the message in the listing
+        msg: Gmail message resource fetched with format='metadata'
+    
+    Returns:
+        The formatted listing entry
+    """
+    hdrs = extract_headers(msg)
+    labels = msg.get('labelIds')
+    has_attachment = any(part.get('filename') for part in _iter_parts(msg['payload']))
+    
+    return (
+        f"{i+1}. Message ID: {msg['id']}\n"
+        f"   Subject: {hdrs.get('subject', 'No Subject')}\n"
+        f"   From: {hdrs.get('from', 'Unknown Sender')}\n"
+        f"   Date: {_format_date(hdrs.get('date', 'Unknown Date'))}\n"
+        f"   Labels: {', '.join(labels) if labels else 'None'}\n"
+        f"   Has Attachments: {'Yes' if has_attachment else 'No'}\n"
+        "   --------------------------------------------------\n"
+    )
+
+# Patterns for the simple HTML to text conversion used by read_email
+_HTML_BR_BLOCK_RE = re.compile(r'<br\s*/?>|</(p|div|h\d)>', re.I)
+# A negated class keeps matching linear on unclosed tags
+_HTML_TAG_RE = re.compile(r'<[^>]*>')
+
+def _html_to_text(html):
+    """
+    Convert an HTML body to plain text
+    
+    Uses selectolax when available, dropping scripts and styles; otherwise
+    falls back to a very simple regex conversion.
+    
+    Args:
+        html: HTML body content
+    
+    Returns:
+        The text content of the HTML
+    """
+    if HTMLParser is not None:
+        tree = HTMLParser(html)
+        for tag in tree.css('script, style'):
+            tag.decompose()
+        root = tree.body or tree.root
+        return root.text(separator='\n') if root else ''
+    
+    text = _HTML_BR_BLOCK_RE.sub('\n', html)
+    text = _HTML_TAG_RE.sub('', text)
+    # Decode all named and numeric entities; non-breaking spaces become plain ones
+    return unescape(text).replace('\xa0', ' ')
+
+_SIZE_UNITS = ('bytes', 'KB', 'MB', 'GB', 'TB')
+
+def _format_size(size):
+    """Format a size in bytes for display, e.g. '2.50 MB'"""
+    if size < 1024:
+        return f"{size} bytes"
+    # Each unit is 2**10 times the previous one
+    i = min((size.bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size / (1 << (10 * i)):.2f} {_SIZE_UNITS[i]}"
+
+def _extract_body_and_attachments(payload, include_attachments=True):
+    """
+    Extract the text body and attachment details from a message payload
+    
+    Walks the MIME tree with an explicit stack, keeping body data base64
+    encoded until the plain text or HTML body has been chosen, so parts
+    that are not used are never decoded.
+    
+    Args:
+        payload: Message payload fetched with format='full'
+        include_attachments: Whether to collect attachment details
+    
+    Returns:
+        Tuple of (body text or None if no text part exists, list of attachments)
+    """
+    plain_data = []
+    html_data = None
+    attachments = []
+    
+    stack = [payload]
+    while stack:
+        part = stack.pop()
+        data = part.get('body', {}).get('data')
+        
+        if data:
+            mime_type = part.get('mimeType', 'text/plain')
+            if mime_type == 'text/plain':
+                plain_data.append(data)
+            elif mime_type == 'text/html' and html_data is None:
+                html_data = data
+        elif part.get('filename'):
+            if include_attachments:
+                attachments.append({
+                    'filename': part['filename'],
+                    'mimeType': part.get('mimeType', 'application/octet-stream'),
+                    'size': _format_size(int(part['body'].get('size', 0)))
+                })
+        elif 'parts' in part:
+            # Reversed so parts are visited in document order
+            stack.extend(reversed(part['parts']))
+    
+    # Prefer plain text if available, otherwise use HTML
+    if plain_data:
+        return "\n".join(_b64.urlsafe_b64decode(data).decode('utf-8', errors='replace') for data in plain_data), attachments
+    if html_data is not None:
+        return _html_to_text(_b64.urlsafe_b64decode(html_data).decode('utf-8', errors='replace')), attachments
+    return None, attachments
+
+# Display name (or bare address) at the start of a From header
+_SENDER_NAME_RE = re.compile(r'"?([^"<]+)"?\s*(?:<[^>]+>)?')
+
+# Cap on concurrent Gmail requests when falling back to per-message fetches
+FETCH_CONCURRENCY = 10
+
+async def fetch_messages(service, msg_ids, metadata_headers=None):
+    """
+    Fetch message metadata for several messages
+    
+    Uses a single batch request, then fetches any messages the batch could
+    not return (or all of them, if the batch endpoint fails) with concurrent
+    individual requests.
+    
+    Args:
+        service: Gmail API service instance
+        msg_ids: List of message IDs
+        metadata_headers: Optional list of headers to include
+    
+    Returns:
+        List of message data in the same order as msg_ids, with None for
+        messages that could not be fetched
+    """
+    try:
+        results = await asyncio.to_thread(
+            get_messages_batch, service, msg_ids,
+            metadata_headers=metadata_headers, fields=MESSAGE_METADATA_FIELDS
+        )
+    except Exception as e:
+        logger.warning(f"Batch fetch failed, fetching messages individually: {str(e)}")
+        results = [None] * len(msg_ids)
+    
+    missing = [i for i, msg in enumerate(results) if msg is None]
+    if not missing:
+        return results
+    
+    semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+    
+    def fetch_one_blocking(msg_id):
+        return get_message(
+            service, msg_id, http=thread_authorized_http(service),
+            metadata_headers=metadata_headers, fields=MESSAGE_METADATA_FIELDS
+        )
+    
+    async def fetch_one(msg_id):
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(fetch_one_blocking, msg_id)
+            except Exception as e:
+                logger.warning(f"Error fetching message {msg_id}: {str(e)}")
+                return None
+    
+    retried = await asyncio.gather(*(fetch_one(msg_ids[i]) for i in missing))
+    for i, msg in zip(missing, retried):
+        results[i] = msg
+    return results
 
 @mcp.tool()
 async def send_email(
@@ -124,39 +512,22 @@ async def send_email(
         service = get_gmail_service()
         
         # Get user profile to use as From address
-        profile = get_profile(service)
-        from_email = profile.get('emailAddress', '')
-        
-        # Create email message
-        message = MIMEMultipart('alternative')
-        message['To'] = to
-        message['Subject'] = subject
-        message['From'] = from_email
-        
-        if cc:
-            message['Cc'] = cc
-            
-        if bcc:
-            message['Bcc'] = bcc
+        from_email = get_from_email(service)
         
         # Set importance if specified
-        if importance:
-            if importance.lower() == "high":
-                message['Importance'] = 'high'
-                message['X-Priority'] = '1'
-            elif importance.lower() == "low":
-                message['Importance'] = 'low'
-                message['X-Priority'] = '5'
-        
-        # Attach plain text version
-        message.attach(MIMEText(body, 'plain'))
+        importance_headers = _IMPORTANCE_HEADERS.get((importance or '').lower())
         
-        # Attach HTML version if provided
-        if html_body:
-            message.attach(MIMEText(html_body, 'html'))
-        
-        # Convert message to string and then to base64 URL-safe string
-        encoded_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+        # Build the message and convert it to a base64 URL-safe string;
+        # plain single-recipient mail skips the general builder entirely
+        if not (html_body or cc or bcc or importance_headers):
+            raw_message = _build_plain_raw(to, subject, from_email, body)
+        else:
+            raw_message = build_raw_message(
+                to, subject, from_email, body,
+                html_body=html_body or None, cc=cc, bcc=bcc,
+                extra_headers=importance_headers
+            )
+        encoded_message = _b64.urlsafe_b64encode(raw_message).decode('utf-8')
         
         # Create message dict for Gmail API
         message_dict = {
@@ -214,52 +585,28 @@ async def send_email_with_attachment(
             
         service = get_gmail_service()
         
-        # Get user profile to use as From address
-        profile = get_profile(service)
-        from_email = profile.get('emailAddress', '')
-        
-        # Create email message
-        message = MIMEMultipart('mixed')
-        message['To'] = to
-        message['Subject'] = subject
-        message['From'] = from_email
-        
-        if cc:
-            message['Cc'] = cc
-            
-        if bcc:
-            message['Bcc'] = bcc
-        
-        # Create the message body as multipart/alternative
-        msgAlternative = MIMEMultipart('alternative')
-        message.attach(msgAlternative)
-        
-        # Attach plain text version
-        msgAlternative.attach(MIMEText(body, 'plain'))
-        
-        # Attach HTML version if provided
-        if html_body:
-            msgAlternative.attach(MIMEText(html_body, 'html'))
-        
-        # Attach file if path is valid
-        if os.path.isfile(attachment_path):
-            filename = os.path.basename(attachment_path)
-            
-            if ctx:
-                ctx.info(f"Attaching file: {filename}")
-                
-            with open(attachment_path, 'rb') as file:
-                part = MIMEApplication(file.read(), Name=filename)
-                part['Content-Disposition'] = f'attachment; filename="{filename}"'
-                message.attach(part)
-        else:
+        # Check the attachment exists before doing any work
+        if not os.path.isfile(attachment_path):
             error_msg = f"Error: Attachment file not found at path {attachment_path}"
             if ctx:
                 ctx.error(error_msg)
             return error_msg
         
-        # Convert message to string and then to base64 URL-safe string
-        encoded_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+        filename = os.path.basename(attachment_path)
+        
+        # Get user profile to use as From address
+        from_email = get_from_email(service)
+        
+        if ctx:
+            ctx.info(f"Attaching file: {filename}")
+        
+        # Build the message and convert it to a base64 URL-safe string
+        raw_message = build_raw_message(
+            to, subject, from_email, body,
+            html_body=html_body or None, cc=cc, bcc=bcc,
+            attachment_paths=[attachment_path]
+        )
+        encoded_message = _b64.urlsafe_b64encode(raw_message).decode('utf-8')
         
         # Create message dict for Gmail API
         message_dict = {
@@ -318,51 +665,22 @@ async def send_email_with_multiple_attachments(
         service = get_gmail_service()
         
         # Get user profile to use as From address
-        profile = get_profile(service)
-        from_email = profile.get('emailAddress', '')
+        from_email = get_from_email(service)
         
-        # Create email message
-        message = MIMEMultipart('mixed')
-        message['To'] = to
-        message['Subject'] = subject
-        message['From'] = from_email
-        
-        if cc:
-            message['Cc'] = cc
-            
-        if bcc:
-            message['Bcc'] = bcc
-        
-        # Create the message body as multipart/alternative
-        msgAlternative = MIMEMultipart('alternative')
-        message.attach(msgAlternative)
-        
-        # Attach plain text version
-        msgAlternative.attach(MIMEText(body, 'plain'))
-        
-        # Attach HTML version if provided
-        if html_body:
-            msgAlternative.attach(MIMEText(html_body, 'html'))
-        
-        # Attach files
-        attached_files = []
+        # Collect the files to attach
+        attached_paths = []
         missing_files = []
         
         for attachment_path in attachment_paths:
             if os.path.isfile(attachment_path):
-                filename = os.path.basename(attachment_path)
-                
                 if ctx:
-                    ctx.info(f"Attaching file: {filename}")
-                    
-                with open(attachment_path, 'rb') as file:
-                    part = MIMEApplication(file.read(), Name=filename)
-                    part['Content-Disposition'] = f'attachment; filename="{filename}"'
-                    message.attach(part)
-                attached_files.append(filename)
+                    ctx.info(f"Attaching file: {os.path.basename(attachment_path)}")
+                attached_paths.append(attachment_path)
             else:
                 missing_files.append(attachment_path)
         
+        attached_files = [os.path.basename(path) for path in attached_paths]
+        
         if missing_files:
             warning_msg = f"Warning: The following attachment files were not found: {', '.join(missing_files)}"
             if ctx:
@@ -371,8 +689,13 @@ async def send_email_with_multiple_attachments(
             if not attached_files:
                 return f"Error: None of the specified attachment files were found. Email not sent."
         
-        # Convert message to string and then to base64 URL-safe string
-        encoded_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+        # Build the message and convert it to a base64 URL-safe string
+        raw_message = build_raw_message(
+            to, subject, from_email, body,
+            html_body=html_body or None, cc=cc, bcc=bcc,
+            attachment_paths=attached_paths
+        )
+        encoded_message = _b64.urlsafe_b64encode(raw_message).decode('utf-8')
         
         # Create message dict for Gmail API
         message_dict = {
@@ -429,30 +752,14 @@ async def create_email_draft(
         service = get_gmail_service()
         
         # Get user profile to use as From address
-        profile = get_profile(service)
-        from_email = profile.get('emailAddress', '')
+        from_email = get_from_email(service)
         
-        # Create email message
-        message = MIMEMultipart('alternative')
-        message['To'] = to
-        message['Subject'] = subject
-        message['From'] = from_email
-        
-        if cc:
-            message['Cc'] = cc
-            
-        if bcc:
-            message['Bcc'] = bcc
-        
-        # Attach plain text version
-        message.attach(MIMEText(body, 'plain'))
-        
-        # Attach HTML version if provided
-        if html_body:
-            message.attach(MIMEText(html_body, 'html'))
-        
-        # Convert message to string and then to base64 URL-safe string
-        encoded_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+        # Build the message and convert it to a base64 URL-safe string
+        raw_message = build_raw_message(
+            to, subject, from_email, body,
+            html_body=html_body or None, cc=cc, bcc=bcc
+        )
+        encoded_message = _b64.urlsafe_b64encode(raw_message).decode('utf-8')
         
         # Create message dict for Gmail API
         message_dict = {
@@ -495,8 +802,8 @@ async def update_email_draft(
             
         service = get_gmail_service()
         
-        # Get existing draft
-        draft_data = get_draft(service, draft_id) # From utils.gmail_api
+        # Get the existing draft as raw RFC 5322 bytes
+        draft_data = get_draft(service, draft_id, format='raw') # From utils.gmail_api
         
         if not draft_data:
             error_msg = f"Error: Draft with ID '{draft_id}' not found."
@@ -505,80 +812,40 @@ async def update_email_draft(
                 ctx.error(error_msg)
             return error_msg
 
-        # Use existing values if new ones are not provided
-        existing_message = draft_data.get('message', {})
-        existing_payload = existing_message.get('payload', {})
-        existing_headers = {
-            header['name'].lower(): header['value'] 
-            for header in existing_payload.get('headers', [])
-        }
-
-        # Determine final values for To, Subject, Cc, Bcc
-        final_to = to if to is not None else existing_headers.get('to', '')
-        final_subject = subject if subject is not None else existing_headers.get('subject', '')
-        final_cc = cc if cc is not None else existing_headers.get('cc', None)
-        final_bcc = bcc if bcc is not None else existing_headers.get('bcc', None)
+        # Only the header block is parsed; the body stays as undecoded bytes
+        existing = BytesHeaderParser().parsebytes(
+            _b64.urlsafe_b64decode(draft_data['message']['raw'])
+        )
+        header_updates = {'To': to, 'Subject': subject, 'Cc': cc, 'Bcc': bcc}
 
-        # Determine final body (plain and HTML)
-        # This part needs more careful handling to preserve existing body if not overridden
-        # For simplicity, this example assumes new body/html_body replaces old if provided
-        # A more robust solution would parse existing parts.
-
-        final_plain_body = body
-        final_html_body = html_body
-
-        if body is None and html_body is None: # Neither new plain nor HTML body provided
-            # Attempt to extract existing body parts
-            # This is a simplified extraction; real email parsing can be more complex
-            parts = existing_payload.get('parts', [])
-            if not parts and 'body' in existing_payload and 'data' in existing_payload['body']: # Single part, not multipart
-                 # This could be plain or HTML, check mimetype
-                if existing_payload.get('mimeType') == 'text/plain':
-                    final_plain_body = base64.urlsafe_b64decode(existing_payload['body']['data']).decode('utf-8')
-                elif existing_payload.get('mimeType') == 'text/html':
-                    final_html_body = base64.urlsafe_b64decode(existing_payload['body']['data']).decode('utf-8')
-            else: # Multipart
-                for part in parts:
-                    if final_plain_body is None and part.get('mimeType') == 'text/plain' and 'data' in part.get('body', {}):
-                        final_plain_body = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
-                    if final_html_body is None and part.get('mimeType') == 'text/html' and 'data' in part.get('body', {}):
-                        final_html_body = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
+        if body is None and html_body is None:
+            # Keep the existing body (and any attachments) untouched and
+            # rewrite only the headers that were provided
+            for name, value in header_updates.items():
+                if value is not None:
+                    del existing[name]
+                    if value:
+                        existing[name] = encode_header(name, value)
+            if 'From' not in existing:
+                existing['From'] = encode_header('From', get_from_email(service))
+            raw_message = existing.as_bytes()
+            final_subject = subject if subject is not None else existing.get('Subject', '')
+        else:
+            # Use existing values if new ones are not provided
+            final_to, final_subject, final_cc, final_bcc = (
+                value if value is not None else (str(existing[name]) if name in existing else None)
+                for name, value in header_updates.items()
+            )
             
-            # If still no plain body, use an empty string as a fallback to avoid errors
-            if final_plain_body is None:
-                final_plain_body = ""
-
-
-        # Create new MIME message
-        if final_html_body:
-            new_mime_message = MIMEMultipart('alternative')
-            if final_plain_body: # Ensure plain body is not None
-                 new_mime_message.attach(MIMEText(final_plain_body, 'plain'))
-            else: # if only html body is present
-                 new_mime_message.attach(MIMEText('', 'plain')) # Attach empty plain part as per RFC
-            new_mime_message.attach(MIMEText(final_html_body, 'html'))
-        elif final_plain_body is not None: # Ensure plain body is not None
-            new_mime_message = MIMEText(final_plain_body, 'plain')
-        else: # Should not happen if fallback to "" is used
-            error_msg = "Error: Cannot update draft with empty body. Provide plain or HTML body."
-            logger.error(error_msg)
-            if ctx: ctx.error(error_msg)
-            return error_msg
-
-
-        new_mime_message['To'] = final_to
-        new_mime_message['Subject'] = final_subject
-        if final_cc:
-            new_mime_message['Cc'] = final_cc
-        if final_bcc:
-            new_mime_message['Bcc'] = final_bcc
-        
-        # Get user profile to use as From address (important if not set in original draft)
-        profile = get_profile(service)
-        from_email = profile.get('emailAddress', '')
-        new_mime_message['From'] = from_email
-
-        encoded_message = base64.urlsafe_b64encode(new_mime_message.as_bytes()).decode('utf-8')
+            # Get user profile to use as From address (important if not set in original draft)
+            from_email = get_from_email(service)
+            
+            # Build the new message; an HTML body gets an (possibly empty) plain part alongside it
+            raw_message = build_raw_message(
+                final_to or '', final_subject or '', from_email, body or '',
+                html_body=html_body or None, cc=final_cc, bcc=final_bcc
+            )
+        encoded_message = _b64.urlsafe_b64encode(raw_message).decode('utf-8')
         
         updated_message_body = {'raw': encoded_message}
         
@@ -586,19 +853,20 @@ async def update_email_draft(
         if ctx:
             ctx.info(f"Sending update request for draft ID: {draft_id}")
             
-        updated_draft = update_draft(service, draft_id, {'message': updated_message_body}) # from utils.gmail_api
+        updated_draft = update_draft(service, draft_id, updated_message_body) # from utils.gmail_api
         
         if ctx:
             ctx.info(f"Draft {updated_draft['id']} updated successfully.")
             
+        final_subject = str(make_header(decode_header(str(final_subject or ''))))
         return f"Draft '{final_subject}' (ID: {updated_draft['id']}) updated successfully."
 
     except HttpError as he:
         error_detail = f"Gmail API error: {he.resp.status} - {he._get_reason()}"
         try:
-            error_content = json.loads(he.content.decode())
+            error_content = _json.loads(he.content)
             error_detail = error_content.get("error", {}).get("message", error_detail)
-        except:
+        except (ValueError, AttributeError, KeyError):
             pass # Keep original error_detail if parsing fails
         logger.error(f"API error updating draft {draft_id}: {error_detail}")
         if ctx: ctx.error(f"API Error: {error_detail}")
@@ -631,15 +899,7 @@ async def send_draft(
             
         service = get_gmail_service()
         
-        # Get the draft
-        draft = get_draft(service, draft_id)
-        if not draft:
-            error_msg = f"Draft with ID {draft_id} not found"
-            if ctx:
-                ctx.error(error_msg)
-            return error_msg
-        
-        # Send the draft
+        # Send the draft; Gmail answers 404 itself if the ID is invalid
         result = service.users().drafts().send(
             userId='me',
             body={'id': draft_id}
@@ -652,6 +912,16 @@ async def send_draft(
             
         return f"Draft sent successfully. Message ID: {message_id}"
     
+    except HttpError as he:
+        if he.resp.status == 404:
+            error_msg = f"Draft with ID {draft_id} not found"
+        else:
+            error_msg = f"Error sending draft: {str(he)}"
+        logger.error(error_msg)
+        if ctx:
+            ctx.error(error_msg)
+        return error_msg
+    
     except Exception as e:
         error_msg = f"Error sending draft: {str(e)}"
         logger.error(error_msg)
@@ -687,26 +957,35 @@ async def list_email_drafts(
         if not drafts:
             return "No email drafts found."
         
+        # Fetch all draft messages in a single batch request
+        draft_messages = await fetch_messages(
+            service,
+            [draft['message']['id'] for draft in drafts],
+            metadata_headers=['Subject', 'To', 'Date']
+        )
+        
         # Format results
-        result = f"Found {len(drafts)} email drafts:\n\n"
+        parts = [f"Found {len(drafts)} email drafts:\n\n"]
         
-        for i, draft in enumerate(drafts):
-            # Get the draft message
-            draft_message = get_message(service, draft['message']['id'], format='metadata')
+        for i, (draft, draft_message) in enumerate(zip(drafts, draft_messages)):
+            if draft_message is None:
+                continue
             
             # Extract headers
-            headers = draft_message['payload']['headers']
-            subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), 'No Subject')
-            recipient = next((h['value'] for h in headers if h['name'].lower() == 'to'), 'No Recipient')
-            date = next((h['value'] for h in headers if h['name'].lower() == 'date'), 'Unknown Date')
+            hdrs = extract_headers(draft_message)
+            subject = hdrs.get('subject', 'No Subject')
+            recipient = hdrs.get('to', 'No Recipient')
+            date = hdrs.get('date', 'Unknown Date')
             
-            result += f"{i+1}. Draft ID: {draft['id']}\n"
-            result += f"   Subject: {subject}\n"
-            result += f"   To: {recipient}\n"
-            result += f"   Created: {date}\n"
-            result += "   --------------------------------------------------\n"
+            parts.append(
+                f"{i+1}. Draft ID: {draft['id']}\n"
+                f"   Subject: {subject}\n"
+                f"   To: {recipient}\n"
+                f"   Created: {date}\n"
+                "   --------------------------------------------------\n"
+            )
         
-        return result
+        return "".join(parts)
     
     except Exception as e:
         error_msg = f"Error listing drafts: {str(e)}"
@@ -744,50 +1023,20 @@ async def search_emails(
         if not messages:
             return f"No emails found matching query: '{query}'."
         
+        # Fetch all messages in a single batch request
+        fetched = await fetch_messages(service, messages, metadata_headers=['Subject', 'From', 'Date'])
+        
         # Format results
-        result = f"Found {len(messages)} emails matching your query:\n\n"
+        parts = [f"Found {len(messages)} emails matching your query:\n\n"]
         
-        for i, msg_id in enumerate(messages):
+        for i, msg in enumerate(fetched):
             if ctx:
                 ctx.report_progress(i, len(messages))
-                
-            msg = get_message(service, msg_id)
-            
-            # Extract headers
-            headers = msg['payload']['headers']
-            subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), 'No Subject')
-            sender = next((h['value'] for h in headers if h['name'].lower() == 'from'), 'Unknown Sender')
-            date = next((h['value'] for h in headers if h['name'].lower() == 'date'), 'Unknown Date')
             
-            # Format the date
-            try:
-                parsed_date = datetime.strptime(date, "%a, %d %b %Y %H:%M:%S %z")
-                date = parsed_date.strftime("%Y-%m-%d %H:%M")
-            except:
-                # If date parsing fails, use the original string
-                pass
-            
-            # Check if message has labels
-            labels = msg.get('labelIds', [])
-            label_str = ", ".join(labels) if labels else "None"
-            
-            # Check if message has attachments
-            has_attachment = False
-            if 'parts' in msg['payload']:
-                for part in msg['payload']['parts']:
-                    if part.get('filename'):
-                        has_attachment = True
-                        break
-            
-            result += f"{i+1}. Message ID: {msg['id']}\n"
-            result += f"   Subject: {subject}\n"
-            result += f"   From: {sender}\n"
-            result += f"   Date: {date}\n"
-            result += f"   Labels: {label_str}\n"
-            result += f"   Has Attachments: {'Yes' if has_attachment else 'No'}\n"
-            result += "   --------------------------------------------------\n"
+            if msg is not None:
+                parts.append(_format_search_row(i, msg))
         
-        return result
+        return "".join(parts)
     
     except Exception as e:
         error_msg = f"Error searching emails: {str(e)}"
@@ -800,6 +1049,7 @@ async def search_emails(
 async def read_email(
     message_id: str,
     include_attachments: bool = False,
+    headers_only: bool = False,
     ctx: Optional[Context] = None
 ) -> str:
     """
@@ -808,6 +1058,7 @@ async def read_email(
     Args:
         message_id: The Gmail message ID to read
         include_attachments: Whether to include information about attachments
+        headers_only: Only fetch and show the headers, skipping the body
         ctx: MCP Context (automatically injected)
     
     Returns:
@@ -819,24 +1070,26 @@ async def read_email(
             
         service = get_gmail_service()
         
-        # Get the message with full content
-        msg = get_message(service, message_id, format='full')
+        if headers_only:
+            # Only the envelope is needed; skip the body entirely
+            msg = get_message(
+                service, message_id,
+                metadata_headers=['Subject', 'From', 'To', 'Cc', 'Date'], fields=MESSAGE_METADATA_FIELDS
+            )
+        else:
+            # Get the message with full content
+            msg = get_message(service, message_id, format='full')
         
         # Extract headers
-        headers = msg['payload']['headers']
-        subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), 'No Subject')
-        sender = next((h['value'] for h in headers if h['name'].lower() == 'from'), 'Unknown Sender')
-        recipient = next((h['value'] for h in headers if h['name'].lower() == 'to'), 'Unknown Recipient')
-        date = next((h['value'] for h in headers if h['name'].lower() == 'date'), 'Unknown Date')
-        cc = next((h['value'] for h in headers if h['name'].lower() == 'cc'), None)
+        hdrs = extract_headers(msg)
+        subject = hdrs.get('subject', 'No Subject')
+        sender = hdrs.get('from', 'Unknown Sender')
+        recipient = hdrs.get('to', 'Unknown Recipient')
+        date = hdrs.get('date', 'Unknown Date')
+        cc = hdrs.get('cc', None)
         
         # Format date if possible
-        try:
-            parsed_date = datetime.strptime(date, "%a, %d %b %Y %H:%M:%S %z")
-            date = parsed_date.strftime("%Y-%m-%d %H:%M")
-        except:
-            # If date parsing fails, use the original string
-            pass
+        date = _format_date(date)
         
         # Decode subject if needed
         try:
@@ -845,104 +1098,42 @@ async def read_email(
                 part.decode(charset or 'utf-8') if isinstance(part, bytes) else part
                 for part, charset in decoded_subject_parts
             ])
-        except:
+        except (ValueError, TypeError, UnicodeDecodeError, LookupError):
             # If decoding fails, use the original string
             pass
         
         # Format headers
-        result = f"Subject: {subject}\n"
-        result += f"From: {sender}\n"
-        result += f"To: {recipient}\n"
+        parts = [f"Subject: {subject}\n", f"From: {sender}\n", f"To: {recipient}\n"]
         if cc:
-            result += f"Cc: {cc}\n"
-        result += f"Date: {date}\n"
+            parts.append(f"Cc: {cc}\n")
+        parts.append(f"Date: {date}\n")
         
         # Check for labels
         labels = msg.get('labelIds', [])
         if labels:
-            result += f"Labels: {', '.join(labels)}\n"
+            parts.append(f"Labels: {', '.join(labels)}\n")
         
-        result += "--------------------------------------------------\n\n"
+        if headers_only:
+            return "".join(parts)
         
-        # Extract message body - recursively process all parts
-        def get_body_and_attachments(payload, attachments=None):
-            if attachments is None:
-                attachments = []
-            
-            # Base case: This is a simple part with data
-            if 'body' in payload and 'data' in payload['body'] and payload['body']['data']:
-                mime_type = payload.get('mimeType', 'text/plain')
-                part_data = payload['body']['data']
-                decoded_data = base64.urlsafe_b64decode(part_data).decode('utf-8', errors='replace')
-                
-                return [(mime_type, decoded_data)], attachments
-            
-            # This part has a filename - it's an attachment
-            if 'filename' in payload and payload['filename']:
-                filename = payload['filename']
-                mime_type = payload.get('mimeType', 'application/octet-stream')
-                
-                # Include attachment info if requested
-                if include_attachments:
-                    size = int(payload['body'].get('size', 0))
-                    size_str = f"{size} bytes"
-                    if size > 1024:
-                        size_str = f"{size/1024:.1f} KB"
-                    if size > 1024*1024:
-                        size_str = f"{size/1024/1024:.1f} MB"
-                        
-                    attachments.append({
-                        'filename': filename,
-                        'mimeType': mime_type,
-                        'size': size_str
-                    })
-                
-                return [], attachments
-            
-            # Recursive case: This is a multipart message
-            if 'parts' in payload:
-                all_parts = []
-                
-                for part in payload['parts']:
-                    part_bodies, updated_attachments = get_body_and_attachments(part, attachments)
-                    all_parts.extend(part_bodies)
-                    attachments = updated_attachments
-                
-                return all_parts, attachments
-            
-            return [], attachments
-        
-        parts, attachments = get_body_and_attachments(msg['payload'])
-        
-        # Prefer plain text if available, otherwise use HTML
-        plain_text_parts = [content for mime_type, content in parts if mime_type == 'text/plain']
-        html_parts = [content for mime_type, content in parts if mime_type == 'text/html']
-        
-        if plain_text_parts:
-            body = "\n".join(plain_text_parts)
-        elif html_parts:
-            # Very simple HTML to text conversion
-            body = html_parts[0]
-            body = re.sub(r'<br\s*/?>|</(p|div|h\d)>', '\n', body)
-            body = re.sub(r'<.*?>', '', body)
-            body = re.sub(r'&nbsp;', ' ', body)
-            body = re.sub(r'&lt;', '<', body)
-            body = re.sub(r'&gt;', '>', body)
-            body = re.sub(r'&amp;', '&', body)
-        else:
+        parts.append("--------------------------------------------------\n\n")
+        
+        # Extract message body and attachment details
+        body, attachments = _extract_body_and_attachments(msg['payload'], include_attachments)
+        if body is None:
             body = "Unable to extract email body content. The email might be empty or contain only non-text attachments."
         
-        result += body
+        parts.append(body)
         
         # Add attachment information if requested
         if include_attachments and attachments:
-            result += "\n\n--------------------------------------------------\n"
-            result += f"Attachments ({len(attachments)}):\n"
+            parts.append("\n\n--------------------------------------------------\n")
+            parts.append(f"Attachments ({len(attachments)}):\n")
             
             for i, attachment in enumerate(attachments):
-                result += f"{i+1}. {attachment['filename']} ({attachment['mimeType']}, {attachment['size']})\n"
+                parts.append(f"{i+1}. {attachment['filename']} ({attachment['mimeType']}, {attachment['size']})\n")
         
-        return result
+        return "".join(parts)
     
     except Exception as e:
         error_msg = f"Error reading email: {str(e)}"
@@ -951,6 +1142,23 @@ async def read_email(
             ctx.error(error_msg)
         return error_msg
 
+@mcp.tool()
+async def peek_email(
+    message_id: str,
+    ctx: Optional[Context] = None
+) -> str:
+    """
+    Show only the headers of a specific email, without downloading its body
+    
+    Args:
+        message_id: The Gmail message ID to peek at
+        ctx: MCP Context (automatically injected)
+    
+    Returns:
+        The subject, sender, recipients, date and labels of the email
+    """
+    return await read_email(message_id, headers_only=True, ctx=ctx)
+
 @mcp.tool()
 async def get_unread_emails(
     max_results: int = 5,
@@ -1071,19 +1279,19 @@ async def get_email_labels(
         system_labels = [label for label in labels if label.get('type') == 'system']
         user_labels = [label for label in labels if label.get('type') == 'user']
         
-        result = "Gmail Labels:\n\n"
+        parts = ["Gmail Labels:\n\n"]
         
         if system_labels:
-            result += "System Labels:\n"
+            parts.append("System Labels:\n")
             for label in system_labels:
-                result += f"- {label['name']} (ID: {label['id']})\n"
+                parts.append(f"- {label['name']} (ID: {label['id']})\n")
         
         if user_labels:
-            result += "\nUser Labels:\n"
+            parts.append("\nUser Labels:\n")
             for label in user_labels:
-                result += f"- {label['name']} (ID: {label['id']})\n"
+                parts.append(f"- {label['name']} (ID: {label['id']})\n")
         
-        return result
+        return "".join(parts)
     
     except Exception as e:
         error_msg = f"Error getting labels: {str(e)}"
@@ -1114,10 +1322,9 @@ async def create_email_label(
         service = get_gmail_service()
         
         # Check if label already exists
-        existing_labels = get_labels(service)
-        for label in existing_labels:
-            if label['name'].lower() == name.lower():
-                return f"Label '{name}' already exists with ID: {label['id']}"
+        label = find_label(service, name)
+        if label:
+            return f"Label '{name}' already exists with ID: {label['id']}"
         
         # Create the label
         new_label = create_label(service, name)
@@ -1153,24 +1360,17 @@ async def delete_email_label(
         service = get_gmail_service()
         
         # Find label ID from name
-        labels = get_labels(service)
-        label_id = None
+        label = find_label(service, name)
         
-        for label in labels:
-            if label['name'].lower() == name.lower():
-                label_id = label['id']
-                break
-        
-        if not label_id:
+        if not label:
             return f"Label '{name}' not found. Please check the label name."
         
         # Check if it's a system label
-        for label in labels:
-            if label['id'] == label_id and label.get('type') == 'system':
-                return f"Cannot delete system label '{name}'."
+        if label.get('type') == 'system':
+            return f"Cannot delete system label '{name}'."
         
         # Delete the label
-        delete_label(service, label_id)
+        delete_label(service, label['id'])
         
         return f"Label '{name}' deleted successfully."
     
@@ -1204,20 +1404,9 @@ async def label_email(
             
         service = get_gmail_service()
         
-        # Get message to verify it exists
-        try:
-            msg = get_message(service, message_id)
-        except Exception:
-            return f"Message with ID {message_id} not found."
-        
         # Get label ID from name
-        labels = get_labels(service)
-        label_id = None
-        
-        for label in labels:
-            if label['name'].lower() == label_name.lower():
-                label_id = label['id']
-                break
+        label = find_label(service, label_name)
+        label_id = label['id'] if label else None
         
         if not label_id:
             # Create the label if it doesn't exist
@@ -1228,7 +1417,13 @@ async def label_email(
             label_id = new_label['id']
         
         # Apply the label
-        apply_label(service, message_id, label_id)
+        try:
+            apply_label(service, message_id, label_id)
+        except HttpError as he:
+            # Gmail answers 404 for unknown message IDs
+            if he.resp.status == 404:
+                return f"Message with ID {message_id} not found."
+            raise
         
         return f"Label '{label_name}' applied to message {message_id}"
     
@@ -1262,30 +1457,21 @@ async def remove_email_label(
             
         service = get_gmail_service()
         
-        # Get message to verify it exists
-        try:
-            msg = get_message(service, message_id)
-        except Exception:
-            return f"Message with ID {message_id} not found."
-        
         # Get label ID from name
-        labels = get_labels(service)
-        label_id = None
-        
-        for label in labels:
-            if label['name'].lower() == label_name.lower():
-                label_id = label['id']
-                break
+        label = find_label(service, label_name)
+        label_id = label['id'] if label else None
         
         if not label_id:
             return f"Label '{label_name}' not found. Please check the label name."
         
-        # Check if the message has this label
-        if 'labelIds' not in msg or label_id not in msg['labelIds']:
-            return f"Message {message_id} does not have label '{label_name}'."
-        
-        # Remove the label
-        remove_label(service, message_id, label_id)
+        # Remove the label; removing a label the message lacks is a no-op
+        try:
+            remove_label(service, message_id, label_id)
+        except HttpError as he:
+            # Gmail answers 404 for unknown message IDs
+            if he.resp.status == 404:
+                return f"Message with ID {message_id} not found."
+            raise
         
         return f"Label '{label_name}' removed from message {message_id}"
     
@@ -1317,18 +1503,14 @@ async def mark_as_read(
             
         service = get_gmail_service()
         
-        # Get message to verify it exists
+        # Remove UNREAD label; a no-op if the message is already read
         try:
-            msg = get_message(service, message_id)
-        except Exception:
-            return f"Message with ID {message_id} not found."
-        
-        # Check if message is already read
-        if 'labelIds' in msg and 'UNREAD' not in msg['labelIds']:
-            return f"Message {message_id} is already marked as read."
-        
-        # Remove UNREAD label
-        modify_message(service, message_id, {'removeLabelIds': ['UNREAD']})
+            modify_message(service, message_id, {'removeLabelIds': ['UNREAD']})
+        except HttpError as he:
+            # Gmail answers 404 for unknown message IDs
+            if he.resp.status == 404:
+                return f"Message with ID {message_id} not found."
+            raise
         
         return f"Message {message_id} marked as read"
     
@@ -1360,18 +1542,14 @@ async def mark_as_unread(
             
         service = get_gmail_service()
         
-        # Get message to verify it exists
+        # Add UNREAD label; a no-op if the message is already unread
         try:
-            msg = get_message(service, message_id)
-        except Exception:
-            return f"Message with ID {message_id} not found."
-        
-        # Check if message is already unread
-        if 'labelIds' in msg and 'UNREAD' in msg['labelIds']:
-            return f"Message {message_id} is already marked as unread."
-        
-        # Add UNREAD label
-        modify_message(service, message_id, {'addLabelIds': ['UNREAD']})
+            modify_message(service, message_id, {'addLabelIds': ['UNREAD']})
+        except HttpError as he:
+            # Gmail answers 404 for unknown message IDs
+            if he.resp.status == 404:
+                return f"Message with ID {message_id} not found."
+            raise
         
         return f"Message {message_id} marked as unread"
     
@@ -1403,13 +1581,13 @@ async def delete_email(
             
         service = get_gmail_service()
         
-        # Get message to verify it exists
         try:
-            msg = get_message(service, message_id)
-        except Exception:
-            return f"Message with ID {message_id} not found."
-            
-        delete_message(service, message_id)
+            delete_message(service, message_id)
+        except HttpError as he:
+            # Gmail answers 404 for unknown message IDs
+            if he.resp.status == 404:
+                return f"Message with ID {message_id} not found."
+            raise
         
         return f"Message {message_id} moved to trash."
     
@@ -1452,13 +1630,8 @@ async def batch_apply_label(
             return f"No messages found matching query: '{query}'."
         
         # Get label ID from name
-        labels = get_labels(service)
-        label_id = None
-        
-        for label in labels:
-            if label['name'].lower() == label_name.lower():
-                label_id = label['id']
-                break
+        label = find_label(service, label_name)
+        label_id = label['id'] if label else None
         
         if not label_id:
             # Create the label if it doesn't exist
@@ -1468,23 +1641,11 @@ async def batch_apply_label(
             new_label = create_label(service, label_name)
             label_id = new_label['id']
         
-        # Apply the label to all messages
+        # Apply the label to all messages in a single batchModify call
         total = len(message_ids)
-        success_count = 0
+        apply_label_bulk(service, message_ids, label_id)
         
-        for i, msg_id in enumerate(message_ids):
-            if ctx:
-                ctx.report_progress(i, total)
-                
-            try:
-                apply_label(service, msg_id, label_id)
-                success_count += 1
-                # Small sleep to avoid rate limiting
-                time.sleep(0.1)
-            except Exception as e:
-                logger.warning(f"Error applying label to message {msg_id}: {str(e)}")
-        
-        return f"Label '{label_name}' applied to {success_count} out of {total} messages that matched your query."
+        return f"Label '{label_name}' applied to {total} out of {total} messages that matched your query."
     
     except Exception as e:
         error_msg = f"Error batch applying label: {str(e)}"
@@ -1522,23 +1683,11 @@ async def batch_delete_emails(
         if not message_ids:
             return f"No messages found matching query: '{query}'."
         
-        # Delete all messages
+        # Move all messages to trash in a single batchModify call
         total = len(message_ids)
-        success_count = 0
-        
-        for i, msg_id in enumerate(message_ids):
-            if ctx:
-                ctx.report_progress(i, total)
-                
-            try:
-                delete_message(service, msg_id)
-                success_count += 1
-                # Small sleep to avoid rate limiting
-                time.sleep(0.1)
-            except Exception as e:
-                logger.warning(f"Error deleting message {msg_id}: {str(e)}")
+        delete_messages_bulk(service, message_ids)
         
-        return f"Moved {success_count} out of {total} messages that matched your query to trash."
+        return f"Moved {total} out of {total} messages that matched your query to trash."
     
     except Exception as e:
         error_msg = f"Error batch deleting messages: {str(e)}"
@@ -1571,46 +1720,29 @@ async def get_email_profile(
         if not profile:
             return "Could not retrieve Gmail profile information."
         
-        result = "Gmail Profile Information:\n\n"
-        result += f"Email Address: {profile.get('emailAddress', 'Unknown')}\n"
+        parts = ["Gmail Profile Information:\n\n", f"Email Address: {profile.get('emailAddress', 'Unknown')}\n"]
         
         # Get label usage information
         total_space = int(profile.get('quotaBytesTotal', 0))
         used_space = int(profile.get('quotaBytesUsed', 0))
         
-        # Convert to human-readable format
-        def format_size(size_bytes):
-            if size_bytes < 1024:
-                return f"{size_bytes} bytes"
-            elif size_bytes < 1024 * 1024:
-                return f"{size_bytes / 1024:.2f} KB"
-            elif size_bytes < 1024 * 1024 * 1024:
-                return f"{size_bytes / (1024 * 1024):.2f} MB"
-            else:
-                return f"{size_bytes / (1024 * 1024 * 1024):.2f} GB"
-        
         if total_space > 0:
-            result += f"Storage Used: {format_size(used_space)} of {format_size(total_space)}\n"
-            result += f"Storage Usage: {(used_space / total_space) * 100:.2f}%\n"
+            parts.append(f"Storage Used: {_format_size(used_space)} of {_format_size(total_space)}\n")
+            parts.append(f"Storage Usage: {(used_space / total_space) * 100:.2f}%\n")
         
         # Add information about labels
         labels = get_labels(service)
         num_labels = len(labels)
         num_user_labels = len([l for l in labels if l.get('type') == 'user'])
         
-        result += f"Total Labels: {num_labels} ({num_user_labels} user labels)\n"
+        parts.append(f"Total Labels: {num_labels} ({num_user_labels} user labels)\n")
         
-        # Add message count information
-        # This requires searching for all messages, which can be slow for large inboxes
-        # So we'll just do a basic check for total message count
-        try:
-            all_messages = search_messages(service, "", max_results=1)
-            if 'resultSizeEstimate' in all_messages:
-                result += f"Estimated Message Count: {all_messages['resultSizeEstimate']}\n"
-        except:
-            pass
+        # Add message count information; getProfile already reports the
+        # mailbox total, so no extra search request is needed
+        if 'messagesTotal' in profile:
+            parts.append(f"Estimated Message Count: {profile['messagesTotal']}\n")
         
-        return result
+        return "".join(parts)
     
     except Exception as e:
         error_msg = f"Error getting Gmail profile: {str(e)}"
@@ -1657,35 +1789,38 @@ async def summarize_recent_emails(
         if not message_ids:
             return f"No emails found in the last {days} days" + (f" matching query: '{query}'" if query else ".")
         
+        # Fetch all messages in a single batch request
+        fetched = await fetch_messages(service, message_ids, metadata_headers=['Subject', 'From', 'Date'])
+        
+        # Count and number only the messages that can be shown
+        found = [(msg_id, msg) for msg_id, msg in zip(message_ids, fetched) if msg is not None]
+        if not found:
+            return f"Could not fetch any of the {len(message_ids)} emails found in the last {days} days."
+        
         # Get details for each message
-        summary = f"Summary of {len(message_ids)} recent emails"
+        parts = [f"Summary of {len(found)} recent emails"]
         if query:
-            summary += f" matching '{query}'"
-        summary += f" from the last {days} days:\n\n"
-        
-        for i, msg_id in enumerate(message_ids):
-            if ctx:
-                ctx.report_progress(i, len(message_ids))
-                
-            msg = get_message(service, msg_id)
-            
+            parts.append(f" matching '{query}'")
+        parts.append(f" from the last {days} days")
+        missing = len(message_ids) - len(found)
+        if missing:
+            parts.append(f" ({missing} could not be fetched)")
+        parts.append(":\n\n")
+        
+        total = len(found)
+        for i, (msg_id, msg) in enumerate(found):
             # Extract headers
-            headers = msg['payload']['headers']
-            subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), 'No Subject')
-            sender = next((h['value'] for h in headers if h['name'].lower() == 'from'), 'Unknown Sender')
-            date = next((h['value'] for h in headers if h['name'].lower() == 'date'), 'Unknown Date')
+            hdrs = extract_headers(msg)
+            subject = hdrs.get('subject', 'No Subject')
+            sender = hdrs.get('from', 'Unknown Sender')
+            date = hdrs.get('date', 'Unknown Date')
             
             # Format the date
-            try:
-                parsed_date = datetime.strptime(date, "%a, %d %b %Y %H:%M:%S %z")
-                date = parsed_date.strftime("%Y-%m-%d %H:%M")
-            except:
-                # If date parsing fails, use the original string
-                pass
+            date = _format_date(date)
             
             # Extract sender name if available
             sender_name = sender
-            match = re.search(r'"?([^"<]+)"?\s*(?:<[^>]+>)?', sender)
+            match = _SENDER_NAME_RE.search(sender)
             if match:
                 sender_name = match.group(1).strip()
             
@@ -1695,17 +1830,20 @@ async def summarize_recent_emails(
             is_important = 'IMPORTANT' in labels
             
             # Format summary line
-            summary += f"{i+1}. {subject}\n"
-            summary += f"   From: {sender_name} | {date}"
+            parts.append(f"{i+1}. {subject}\n   From: {sender_name} | {date}")
             
             if is_unread:
-                summary += " | UNREAD"
+                parts.append(" | UNREAD")
             if is_important:
-                summary += " | IMPORTANT"
+                parts.append(" | IMPORTANT")
                 
-            summary += f"\n   ID: {msg_id}\n\n"
+            parts.append(f"\n   ID: {msg_id}\n\n")
+            
+            # Let the client render progress as each email is summarized
+            if ctx:
+                await ctx.report_progress(i + 1, total, message=f"Processed {i+1}/{total}: {subject[:60]}")
         
-        return summary
+        return "".join(parts)
     
     except Exception as e:
         error_msg = f"Error summarizing emails: {str(e)}"
@@ -1753,7 +1891,6 @@ if __name__ == "__main__":
                 @app.get("/health")
                 async def health():
                     try:
-                        from utils.auth import get_gmail_service
                         service = get_gmail_service()
                         profile = service.users().getProfile(userId='me').execute()
                         gmail_status = "connected"
@@ -2,10 +2,22 @@
 """
 Quick tunnel using a simple approach
 """
+import re
 import subprocess
+import threading
 import time
 import sys
 
+# Seconds to wait for localtunnel to report its public URL
+TUNNEL_TIMEOUT = 30
+
+_LT_URL_RE = re.compile(r'https://[a-z0-9-]+\.loca\.lt')
+
+def _drain(stream):
+    """Keep printing the tunnel's output so its pipe never fills up"""
+    for line in stream:
+        print(f"📝 Output: {line.rstrip()}")
+
 def main():
     print("🚀 Creating public tunnel for Gmail MCP Server...")
     print("📍 Local server: http://localhost:8000/sse")
@@ -15,37 +27,61 @@ def main():
         print("\n🔗 Starting localtunnel...")
         print("⏳ This may take a moment...")
         
-        # Run localtunnel and capture output
-        result = subprocess.run(
+        # Start localtunnel and read its output as it arrives
+        proc = subprocess.Popen(
             ['npx', 'localtunnel', '--port', '8000'],
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
-            timeout=30
+            bufsize=1
         )
         
-        # Look for the URL in the output
-        output = result.stdout + result.stderr
-        print(f"📝 Output: {output}")
-        
-        # Extract URL from output
-        lines = output.split('\n')
-        for line in lines:
-            if 'https://' in line and 'loca.lt' in line:
-                url = line.strip()
-                if url.startswith('https://'):
-                    print(f"\n✅ SUCCESS! Your Gmail MCP Server is now public!")
-                    print(f"🌐 Public URL: {url}/sse")
-                    print(f"🔗 Full endpoint: {url}/sse")
-                    print("\n📋 Usage:")
-                    print(f"   - For MCP clients: {url}/sse")
-                    print(f"   - For testing: Visit {url}/sse in browser")
-                    return url
-                    
-        print("❌ Could not extract URL from localtunnel output")
-        print("💡 Try running manually: npx localtunnel --port 8000")
-        
-    except subprocess.TimeoutExpired:
-        print("⏰ Timeout waiting for localtunnel")
+        # Stop waiting (and end the output loop) if no URL shows up in time
+        timed_out = threading.Event()
+        
+        def expire():
+            timed_out.set()
+            proc.kill()
+        
+        timer = threading.Timer(TUNNEL_TIMEOUT, expire)
+        timer.start()
+        
+        url = None
+        try:
+            for line in proc.stdout:
+                print(f"📝 Output: {line.rstrip()}")
+                match = _LT_URL_RE.search(line)
+                if match:
+                    url = match.group(0)
+                    break
+        finally:
+            timer.cancel()
+        
+        if not url:
+            if timed_out.is_set():
+                print("⏰ Timeout waiting for localtunnel")
+            else:
+                print("❌ Could not extract URL from localtunnel output")
+                print("💡 Try running manually: npx localtunnel --port 8000")
+                proc.kill()
+            return None
+        
+        print(f"\n✅ SUCCESS! Your Gmail MCP Server is now public!")
+        print(f"🌐 Public URL: {url}/sse")
+        print(f"🔗 Full endpoint: {url}/sse")
+        print("\n📋 Usage:")
+        print(f"   - For MCP clients: {url}/sse")
+        print(f"   - For testing: Visit {url}/sse in browser")
+        
+        # Keep the tunnel open until interrupted
+        print("\n🛑 Press Ctrl+C to stop the tunnel")
+        threading.Thread(target=_drain, args=(proc.stdout,), daemon=True).start()
+        try:
+            proc.wait()
+        except KeyboardInterrupt:
+            proc.terminate()
+        return url
+        
     except Exception as e:
         print(f"❌ Error: {e}")
         print("\n💡 Alternative: You can manually run:")
@@ -2,49 +2,91 @@
 """
 Simple tunnel using a different approach
 """
+import os
+import re
 import subprocess
-import time
+import threading
 import sys
 
+_LT_URL_RE = re.compile(r'https://[a-z0-9-]+\.loca\.lt')
+
+LOCALTUNNEL_CMD = ['npx', 'localtunnel', '--port', '8000', '--subdomain', 'gmail-mcp']
+
+def _drain(stream):
+    """Pass the tunnel's remaining output through without blocking the main thread"""
+    for chunk in iter(lambda: stream.read1(8192), b''):
+        sys.stdout.buffer.write(chunk)
+        sys.stdout.flush()
+
 def main():
     print("🚀 Creating public tunnel for Gmail MCP Server...")
     print("📍 Local server: http://localhost:8000/sse")
     
+    # --detach: hand the terminal straight to localtunnel instead of
+    # supervising it, so no Python process or pipe stays in between
+    if len(sys.argv) > 1 and sys.argv[1] == "--detach":
+        print("\n🔗 Starting localtunnel (its own output follows)...")
+        sys.stdout.flush()
+        try:
+            os.execvp(LOCALTUNNEL_CMD[0], LOCALTUNNEL_CMD)
+        except OSError as e:
+            print(f"❌ Error: {e}")
+            return
+    
     # Try using localtunnel with explicit output
     try:
         print("\n🔗 Starting localtunnel...")
+        # Block-buffered binary pipe; output is split into lines below
         process = subprocess.Popen(
-            ['npx', 'localtunnel', '--port', '8000', '--subdomain', 'gmail-mcp'],
+            LOCALTUNNEL_CMD,
             stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-            universal_newlines=True
+            stderr=subprocess.STDOUT
         )
         
         print("⏳ Waiting for tunnel to establish...")
         
-        # Read output line by line
-        for line in iter(process.stdout.readline, ''):
-            print(f"📝 {line.strip()}")
-            if 'https://' in line and 'localtunnel' in line:
-                url = line.strip().split()[-1] if line.strip().split() else ""
-                if url.startswith('https://'):
-                    print(f"\n✅ SUCCESS! Your Gmail MCP Server is now public!")
-                    print(f"🌐 Public URL: {url}/sse")
-                    print(f"🔗 Full endpoint: {url}/sse")
-                    print("\n📋 Usage:")
-                    print(f"   - For MCP clients: {url}/sse")
-                    print(f"   - For testing: Visit {url}/sse in browser")
-                    print("\n⏹️  Press Ctrl+C to stop the tunnel")
-                    
-                    try:
-                        while True:
-                            time.sleep(1)
-                    except KeyboardInterrupt:
-                        print("\n🛑 Stopping tunnel...")
-                        process.terminate()
-                        return
+        # Read whatever output is available and handle complete lines only
+        url = None
+        pending = bytearray()
+        while url is None:
+            chunk = process.stdout.read1(8192)
+            if not chunk:
+                break
+            pending += chunk
+            *lines, rest = pending.split(b'\n')
+            pending = bytearray(rest)
+            
+            for i, raw_line in enumerate(lines):
+                line = raw_line.decode('utf-8', errors='replace').strip()
+                print(f"📝 {line}")
+                match = _LT_URL_RE.search(line)
+                if match:
+                    url = match.group(0)
+                    # Keep the lines after the URL for the output drained below
+                    pending = bytearray(b''.join(l + b'\n' for l in lines[i + 1:]) + rest)
+                    break
+        
+        if url:
+            print(f"\n✅ SUCCESS! Your Gmail MCP Server is now public!")
+            print(f"🌐 Public URL: {url}/sse")
+            print(f"🔗 Full endpoint: {url}/sse")
+            print("\n📋 Usage:")
+            print(f"   - For MCP clients: {url}/sse")
+            print(f"   - For testing: Visit {url}/sse in browser")
+            print("\n⏹️  Press Ctrl+C to stop the tunnel")
+            
+            # Output read along with the URL line would otherwise be lost
+            if pending:
+                sys.stdout.flush()
+                sys.stdout.buffer.write(pending)
+                sys.stdout.flush()
+            threading.Thread(target=_drain, args=(process.stdout,), daemon=True).start()
+            try:
+                process.wait()
+            except KeyboardInterrupt:
+                print("\n🛑 Stopping tunnel...")
+                process.terminate()
+                return
                         
     except KeyboardInterrupt:
         print("\n🛑 Stopped by user")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Tests for the landing page handler
+"""
+
+import gzip
+import unittest
+import sys
+import os
+
+# Add parent directory to path for importing the api package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.index import render_page
+
+
+class TestRenderPage(unittest.TestCase):
+    """Test cases for landing page content negotiation"""
+    
+    def test_gzip_variant_has_its_own_etag(self):
+        """Test that the gzip and identity responses cannot validate each other"""
+        status, headers, body = render_page(accept_encoding='gzip, deflate')
+        gzip_etag = dict(headers)['ETag']
+        self.assertEqual(dict(headers)['Content-Encoding'], 'gzip')
+        
+        status, headers, plain = render_page(accept_encoding='')
+        plain_etag = dict(headers)['ETag']
+        self.assertNotEqual(gzip_etag, plain_etag)
+        self.assertEqual(gzip.decompress(body), plain)
+        
+        self.assertEqual(render_page(gzip_etag, 'gzip')[0], 304)
+        self.assertEqual(render_page(gzip_etag, '')[0], 200)
+        self.assertEqual(render_page(plain_etag, '')[0], 304)
+        self.assertEqual(render_page(plain_etag, 'gzip')[0], 200)
+    
+    def test_gzip_with_zero_quality_is_refused(self):
+        """Test that q=0 excludes gzip, including through a wildcard"""
+        for accept_encoding in ('gzip;q=0', 'gzip; q=0.0, br', '*;q=0', 'identity'):
+            headers = dict(render_page(accept_encoding=accept_encoding)[1])
+            self.assertNotIn('Content-Encoding', headers, accept_encoding)
+        
+        for accept_encoding in ('gzip;q=0.5', '*', 'br, x-gzip'):
+            headers = dict(render_page(accept_encoding=accept_encoding)[1])
+            self.assertEqual(headers.get('Content-Encoding'), 'gzip', accept_encoding)
+
+
+if __name__ == '__main__':
+    unittest.main()
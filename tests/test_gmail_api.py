@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Tests for the Gmail API utilities
+"""
+
+import asyncio
+import base64
+import unittest
+from email import message_from_bytes
+from email.header import decode_header, make_header
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Add parent directory to path for importing utility modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import utils.gmail_api as gmail_api
+from utils.gmail_api import (
+    Query,
+    aget_message,
+    batch_modify_messages,
+    create_label,
+    extract_headers,
+    find_label,
+    forward_message,
+    get_attachment_from_message,
+    get_attachments_batch,
+    get_label,
+    get_label_map,
+    get_labels,
+    get_message,
+    get_message_batched,
+    get_messages_batch,
+    get_threads_batch,
+    modify_message,
+    permanently_delete_messages_bulk,
+    search_messages,
+)
+
+
+class FakeBatch:
+    """Minimal stand-in for googleapiclient's BatchHttpRequest"""
+    
+    def __init__(self, callback, responses, errors=()):
+        self.callback = callback
+        self.responses = responses
+        self.errors = errors
+        self.request_ids = []
+    
+    def add(self, request, request_id=None):
+        self.request_ids.append(request_id)
+    
+    def execute(self, http=None):
+        for request_id in self.request_ids:
+            if request_id in self.errors:
+                self.callback(request_id, None, Exception('not found'))
+            else:
+                self.callback(request_id, self.responses[request_id], None)
+
+
+class TestGmailApi(unittest.TestCase):
+    """Test cases for Gmail API utility functions"""
+    
+    def setUp(self):
+        gmail_api._MESSAGE_CACHE.clear()
+        gmail_api._LABEL_CACHE.clear()
+        gmail_api.close_micro_batchers()
+    
+    def make_service(self, responses, errors=()):
+        service = MagicMock()
+        service.batches = []
+        
+        def new_batch_http_request(callback):
+            batch = FakeBatch(callback, responses, errors)
+            service.batches.append(batch)
+            return batch
+        
+        service.new_batch_http_request.side_effect = new_batch_http_request
+        return service
+    
+    def test_get_messages_batch_preserves_order(self):
+        """Test that batched messages come back in request order"""
+        responses = {'a': {'id': 'a'}, 'b': {'id': 'b'}, 'c': {'id': 'c'}}
+        service = self.make_service(responses, errors={'b'})
+        
+        result = get_messages_batch(service, ['c', 'b', 'a'])
+        
+        self.assertEqual(result, [{'id': 'c'}, None, {'id': 'a'}])
+        self.assertEqual(len(service.batches), 1)
+    
+    @patch('utils.gmail_api.thread_authorized_http')
+    def test_get_messages_batch_splits_large_requests(self, mock_http):
+        """Test that more than 100 messages are split across concurrent batches"""
+        ids = [str(i) for i in range(150)]
+        service = self.make_service({i: {'id': i} for i in ids})
+        
+        result = get_messages_batch(service, ids)
+        
+        self.assertEqual([m['id'] for m in result], ids)
+        self.assertEqual([len(b.request_ids) for b in service.batches], [100, 50])
+    
+    @patch('utils.gmail_api.thread_authorized_http')
+    def test_get_messages_batch_reuses_worker_threads(self, mock_http):
+        """Test that multi-batch fetches run on the same long-lived workers"""
+        import threading
+        ids = [str(i) for i in range(300)]
+        service = self.make_service({i: {'id': i} for i in ids})
+        workers = set()
+        
+        def execute(batch, http=None):
+            workers.add(threading.current_thread())
+            FakeBatch.execute(batch, http)
+        
+        with patch.object(gmail_api, '_execute_batch', execute):
+            get_messages_batch(service, ids[:150])
+            get_messages_batch(service, ids[150:])
+        
+        self.assertTrue(all(t.name.startswith('gmail-api') and t.is_alive() for t in workers))
+        self.assertLessEqual(len(workers), gmail_api.BATCH_WORKERS)
+    
+    def test_get_messages_batch_fetches_duplicates_once(self):
+        """Test that a repeated message ID is requested once but returned for each position"""
+        service = self.make_service({'a': {'id': 'a'}, 'b': {'id': 'b'}})
+        
+        result = get_messages_batch(service, ['a', 'b', 'a'])
+        
+        self.assertEqual(result, [{'id': 'a'}, {'id': 'b'}, {'id': 'a'}])
+        self.assertEqual(service.batches[0].request_ids, ['a', 'b'])
+    
+    def test_get_threads_batch_preserves_order(self):
+        """Test that batched threads come back in request order"""
+        service = self.make_service({'t1': {'id': 't1'}, 't2': {'id': 't2'}}, errors={'t3'})
+        
+        result = get_threads_batch(service, ['t2', 't3', 't1'])
+        
+        self.assertEqual(result, [{'id': 't2'}, None, {'id': 't1'}])
+    
+    def test_get_attachments_batch_decodes_data(self):
+        """Test that batched attachments are returned as decoded bytes"""
+        service = self.make_service({'a1': {'data': 'aGVsbG8='}})
+        
+        result = get_attachments_batch(service, 'msg', ['a1'])
+        
+        self.assertEqual(result, [b'hello'])
+    
+    def test_get_attachment_from_message_uses_inline_data(self):
+        """Test that inline attachment data is decoded without another request"""
+        service = MagicMock()
+        message = {'id': 'msg', 'payload': {'parts': [
+            {'partId': '0', 'body': {'data': 'Ym9keQ=='}},
+            {'partId': '1', 'filename': 'a.txt', 'body': {'attachmentId': 'att1', 'data': 'aGVsbG8='}},
+            {'partId': '2', 'filename': 'b.pdf', 'body': {'attachmentId': 'att2', 'size': 900000}},
+        ]}}
+        service.users().messages().attachments().get().execute.return_value = {'data': 'cGRm'}
+        
+        self.assertEqual(get_attachment_from_message(service, message, 'att1'), b'hello')
+        service.users().messages().attachments().get().execute.assert_not_called()
+        
+        self.assertEqual(get_attachment_from_message(service, message, 'att2'), b'pdf')
+        service.users().messages().attachments().get().execute.assert_called_once()
+    
+    @patch('utils.gmail_api.thread_authorized_http')
+    def test_get_message_batched_coalesces_concurrent_calls(self, mock_http):
+        """Test that fetches from several threads share one batch request"""
+        from concurrent.futures import ThreadPoolExecutor
+        service = self.make_service({str(i): {'id': str(i)} for i in range(5)})
+        
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            result = list(executor.map(lambda i: get_message_batched(service, str(i)), range(5)))
+        
+        self.assertEqual(result, [{'id': str(i)} for i in range(5)])
+        self.assertLessEqual(len(service.batches), 2)
+    
+    @patch('utils.gmail_api.thread_authorized_http')
+    def test_get_message_batched_fails_unanswered_fetches(self, mock_http):
+        """Test that a message missing from the batch response raises instead of hanging"""
+        service = self.make_service({})
+        
+        with patch.object(FakeBatch, 'execute', lambda self, http=None: None):
+            with self.assertRaises(RuntimeError):
+                get_message_batched(service, 'a')
+    
+    @patch('utils.gmail_api.thread_authorized_http')
+    def test_micro_batcher_stops_when_service_is_collected(self, mock_http):
+        """Test that batcher threads do not outlive their service"""
+        import gc
+        service = self.make_service({'a': {'id': 'a'}})
+        get_message_batched(service, 'a')
+        (batcher,) = gmail_api._MICRO_BATCHERS[service].values()
+        
+        # The mock records its call arguments, which would keep the service alive
+        mock_http.reset_mock()
+        del service
+        gc.collect()
+        batcher._thread.join(timeout=1)
+        
+        self.assertFalse(batcher._thread.is_alive())
+        self.assertEqual(len(gmail_api._MICRO_BATCHERS), 0)
+    
+    def test_cached_messages_are_copies(self):
+        """Test that mutating a returned message does not change the cached one"""
+        service = MagicMock()
+        service.users().messages().get().execute.return_value = {'id': 'a', 'labelIds': ['INBOX']}
+        
+        get_message(service, 'a')['labelIds'].append('STARRED')
+        get_message(service, 'a')['labelIds'].append('UNREAD')
+        
+        self.assertEqual(get_message(service, 'a')['labelIds'], ['INBOX'])
+        service.users().messages().get().execute.assert_called_once()
+    
+    def test_get_message_requests_only_listed_headers(self):
+        """Test that metadata headers are passed through to the API"""
+        service = MagicMock()
+        
+        get_message(service, 'abc', metadata_headers=['Subject', 'From'])
+        
+        service.users().messages().get.assert_called_with(
+            userId='me', id='abc', format='metadata', metadataHeaders=['Subject', 'From']
+        )
+    
+    @patch('utils.gmail_api.thread_authorized_http')
+    def test_aget_message_runs_concurrently_on_thread_connections(self, mock_http):
+        """Test that async fetches each use the worker thread's own connection"""
+        service = MagicMock()
+        service.users().messages().get().execute.side_effect = lambda http: {'http': http}
+        
+        async def fetch_all():
+            return await asyncio.gather(*(aget_message(service, str(i)) for i in range(3)))
+        
+        result = asyncio.run(fetch_all())
+        
+        self.assertEqual(result, [{'http': mock_http.return_value}] * 3)
+    
+    def test_get_labels_is_cached_until_a_label_changes(self):
+        """Test that labels are listed once and re-listed after create_label"""
+        service = MagicMock()
+        labels_api = service.users().labels()
+        labels_api.list().execute.return_value = {'labels': [{'id': 'L1', 'name': 'Work'}]}
+        labels_api.list.reset_mock()
+        
+        get_labels(service)
+        self.assertEqual(get_label(service, 'L1'), {'id': 'L1', 'name': 'Work'})
+        self.assertEqual(labels_api.list.call_count, 1)
+        labels_api.get.assert_not_called()
+        
+        self.assertEqual(get_label_map(service), {'Work': 'L1'})
+        self.assertEqual(labels_api.list.call_count, 1)
+        
+        create_label(service, 'Home')
+        get_labels(service)
+        self.assertEqual(labels_api.list.call_count, 2)
+    
+    def test_cached_labels_are_copies(self):
+        """Test that mutating the returned label list does not change the cached one"""
+        service = MagicMock()
+        service.users().labels().list().execute.return_value = {'labels': [{'id': 'L1', 'name': 'Work'}]}
+        
+        get_labels(service).append({'id': 'L2', 'name': 'Home'})
+        get_labels(service)[0]['name'] = 'Changed'
+        
+        self.assertEqual(get_labels(service), [{'id': 'L1', 'name': 'Work'}])
+        self.assertEqual(get_label_map(service), {'Work': 'L1'})
+    
+    def test_find_label_ignores_case_and_sees_new_labels(self):
+        """Test that name lookups use the cached list until a label is created"""
+        service = MagicMock()
+        labels_api = service.users().labels()
+        labels_api.list().execute.return_value = {'labels': [{'id': 'L1', 'name': 'Work'}]}
+        labels_api.list.reset_mock()
+        
+        self.assertEqual(find_label(service, 'work')['id'], 'L1')
+        self.assertIsNone(find_label(service, 'Home'))
+        self.assertEqual(labels_api.list.call_count, 1)
+        
+        create_label(service, 'Home')
+        labels_api.list().execute.return_value = {'labels': [
+            {'id': 'L1', 'name': 'Work'}, {'id': 'L2', 'name': 'Home'}
+        ]}
+        self.assertEqual(find_label(service, 'HOME')['id'], 'L2')
+    
+    def test_forward_message_takes_subject_from_raw_message(self):
+        """Test that forwarding uses the original subject with a single fetch"""
+        service = MagicMock()
+        raw = base64.urlsafe_b64encode(b'Subject: =?utf-8?q?Caf=C3=A9?=\r\n\r\nHello').decode()
+        service.users().messages().get().execute.return_value = {'raw': raw}
+        service.users().messages().get.reset_mock()
+        
+        forward_message(service, 'abc', 'to@example.com')
+        
+        service.users().messages().get.assert_called_once()
+        sent = service.users().messages().send.call_args.kwargs['body']['raw']
+        subject = message_from_bytes(base64.urlsafe_b64decode(sent))['Subject']
+        self.assertEqual(str(make_header(decode_header(subject))), 'Fwd: Café')
+    
+    def test_forward_message_logs_http_errors(self):
+        """Test that forward_message is wrapped by gmail_call like the other helpers"""
+        self.assertTrue(hasattr(forward_message, '__wrapped__'))
+        self.assertFalse(hasattr(gmail_api.encode_header, '__wrapped__'))
+    
+    def test_forward_message_rejects_header_injection(self):
+        """Test that a recipient cannot add headers and is sent as ASCII"""
+        service = MagicMock()
+        raw = base64.urlsafe_b64encode(b'Subject: Hi\r\n\r\nHello').decode()
+        service.users().messages().get().execute.return_value = {'raw': raw}
+        
+        forward_message(service, 'abc', 'Zoë <to@example.com>\r\nBcc: evil@example.com')
+        
+        sent = base64.urlsafe_b64decode(service.users().messages().send.call_args.kwargs['body']['raw'])
+        header_block = sent.split(b'\r\n\r\n', 1)[0]
+        self.assertTrue(header_block.isascii())
+        self.assertNotIn(b'\r\nBcc:', header_block)
+        self.assertIsNone(message_from_bytes(sent)['Bcc'])
+
+    def test_permanently_delete_messages_bulk_splits_large_requests(self):
+        """Test that more than 1000 IDs are split across batchDelete calls"""
+        service = MagicMock()
+        
+        permanently_delete_messages_bulk(service, [str(i) for i in range(2500)])
+        
+        calls = service.users().messages().batchDelete.call_args_list
+        self.assertEqual([len(c.kwargs['body']['ids']) for c in calls], [1000, 1000, 500])
+    
+    def test_query_builder_quotes_and_formats_terms(self):
+        """Test that built queries quote multi-word values and format dates"""
+        from datetime import date
+        query = Query().from_('boss@example.com').subject('weekly report').after(date(2024, 1, 5))
+        
+        self.assertEqual(str(query), 'from:boss@example.com subject:"weekly report" after:2024/01/05')
+        self.assertEqual(str(query.is_('unread')).split()[-1], 'is:unread')
+    
+    def test_extract_headers_keeps_first_of_requested_headers(self):
+        """Test that only requested headers are indexed and the first occurrence wins"""
+        message = {'payload': {'headers': [
+            {'name': 'Subject', 'value': 'First'},
+            {'name': 'Received', 'value': 'relay'},
+            {'name': 'SUBJECT', 'value': 'Second'},
+        ]}}
+        
+        self.assertEqual(extract_headers(message, ['subject']), {'subject': 'First'})
+        self.assertEqual(extract_headers({}), {})
+    
+    @patch('utils.gmail_api.thread_authorized_http')
+    def test_search_messages_pages_past_the_page_limit(self, mock_http):
+        """Test that more than 500 results are collected across pages, and no more"""
+        service = MagicMock()
+        pages = {
+            None: {'messages': [{'id': str(i)} for i in range(500)], 'nextPageToken': 'p2'},
+            'p2': {'messages': [{'id': str(i)} for i in range(500, 600)], 'nextPageToken': 'p3'},
+        }
+        
+        def list_request(**params):
+            request = MagicMock()
+            request.execute.return_value = pages[params.get('pageToken')]
+            return request
+        
+        service.users().messages().list.side_effect = list_request
+        
+        result = search_messages(service, 'in:inbox', max_results=600)
+        
+        self.assertEqual(result, [str(i) for i in range(600)])
+        calls = service.users().messages().list.call_args_list
+        self.assertEqual([c.kwargs.get('pageToken') for c in calls], [None, 'p2'])
+        self.assertEqual([c.kwargs['maxResults'] for c in calls], [500, 100])
+    
+    def test_metadata_fetches_are_cached_until_modified(self):
+        """Test that a repeated metadata fetch is served from cache until the message changes"""
+        service = self.make_service({'a': {'id': 'a', 'labelIds': ['UNREAD']}})
+        
+        get_messages_batch(service, ['a'])
+        self.assertEqual(get_message(service, 'a'), {'id': 'a', 'labelIds': ['UNREAD']})
+        service.users().messages().get().execute.assert_not_called()
+        
+        modify_message(service, 'a', {'removeLabelIds': ['UNREAD']})
+        get_message(service, 'a')
+        service.users().messages().get().execute.assert_called_once()
+    
+    def test_batch_modify_messages_splits_large_requests(self):
+        """Test that more than 1000 IDs are split across batchModify calls"""
+        service = MagicMock()
+        ids = [str(i) for i in range(1500)]
+        
+        batch_modify_messages(service, ids, {'addLabelIds': ['L1']})
+        
+        calls = service.users().messages().batchModify.call_args_list
+        self.assertEqual([len(c.kwargs['body']['ids']) for c in calls], [1000, 500])
+        self.assertTrue(all(c.kwargs['body']['addLabelIds'] == ['L1'] for c in calls))
+
+
+if __name__ == '__main__':
+    unittest.main()
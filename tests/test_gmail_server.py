@@ -18,12 +18,14 @@ class TestGmailServer(unittest.TestCase):
     """Test cases for Gmail MCP Server functions"""
     
     @patch('gmail_server.get_gmail_service')
+    @patch('gmail_server.get_from_email')
     @patch('gmail_server.send_message')
-    def test_send_email(self, mock_send_message, mock_get_service):
+    def test_send_email(self, mock_send_message, mock_get_from_email, mock_get_service):
         """Test sending an email"""
         # Setup mocks
         mock_service = MagicMock()
         mock_get_service.return_value = mock_service
+        mock_get_from_email.return_value = 'me@example.com'
         mock_send_message.return_value = {'id': 'msg123'}
         
         # Call the function (we need to handle the async function)
@@ -42,8 +44,8 @@ class TestGmailServer(unittest.TestCase):
 
     @patch('gmail_server.get_gmail_service')
     @patch('gmail_server.search_messages')
-    @patch('gmail_server.get_message')
-    def test_search_emails(self, mock_get_message, mock_search_messages, mock_get_service):
+    @patch('gmail_server.get_messages_batch')
+    def test_search_emails(self, mock_get_messages_batch, mock_search_messages, mock_get_service):
         """Test searching emails"""
         # Setup mocks
         mock_service = MagicMock()
@@ -72,8 +74,8 @@ class TestGmailServer(unittest.TestCase):
             }
         }
         
-        # Configure get_message to return different messages
-        mock_get_message.side_effect = [mock_message1, mock_message2]
+        # Configure the batch fetch to return both messages
+        mock_get_messages_batch.return_value = [mock_message1, mock_message2]
         
         # Call the function
         import asyncio
@@ -82,7 +84,8 @@ class TestGmailServer(unittest.TestCase):
         # Assertions
         mock_get_service.assert_called_once()
         mock_search_messages.assert_called_once_with(mock_service, 'test query', 2)
-        self.assertEqual(mock_get_message.call_count, 2)
+        mock_get_messages_batch.assert_called_once()
+        self.assertEqual(mock_get_messages_batch.call_args[0][1], ['msg1', 'msg2'])
         self.assertIn('Test Subject 1', result)
         self.assertIn('Test Subject 2', result)
 
@@ -128,6 +131,241 @@ class TestGmailServer(unittest.TestCase):
         self.assertIn('recipient@example.com', result)
         self.assertIn(test_body, result)
 
+    @patch('gmail_server.get_gmail_service')
+    @patch('gmail_server.get_message')
+    def test_read_email_headers_only(self, mock_get_message, mock_get_service):
+        """Test that a headers-only read requests metadata and skips the body"""
+        mock_get_message.return_value = {
+            'id': 'msg1',
+            'payload': {'headers': [
+                {'name': 'Subject', 'value': 'Test Subject'},
+                {'name': 'From', 'value': 'sender@example.com'},
+            ]}
+        }
+        
+        import asyncio
+        result = asyncio.run(read_email(message_id='msg1', headers_only=True))
+        
+        self.assertIn('Subject: Test Subject', result)
+        self.assertNotIn('-----', result)
+        self.assertNotIn('format', mock_get_message.call_args.kwargs)
+    
+    @patch('gmail_server.get_gmail_service')
+    @patch('gmail_server.search_messages')
+    def test_summarize_recent_emails_numbers_only_fetched_messages(self, mock_search_messages, mock_get_service):
+        """Test that messages which could not be fetched leave no gap in the summary"""
+        import asyncio
+        from unittest.mock import AsyncMock
+        import gmail_server
+        
+        def message(subject):
+            return {'payload': {'headers': [{'name': 'Subject', 'value': subject}]}}
+        
+        mock_search_messages.return_value = ['m1', 'm2', 'm3']
+        with patch('gmail_server.fetch_messages', AsyncMock(return_value=[message('A'), None, message('C')])):
+            result = asyncio.run(gmail_server.summarize_recent_emails())
+        
+        self.assertIn('Summary of 2 recent emails', result)
+        self.assertIn('(1 could not be fetched)', result)
+        self.assertIn('1. A', result)
+        self.assertIn('2. C', result)
+        self.assertNotIn('3. ', result)
+    
+    def test_build_raw_message(self):
+        """Test that hand-built messages parse back correctly"""
+        import email
+        from email import policy
+        from gmail_server import build_raw_message
+        
+        raw = build_raw_message(
+            'Jöhn <john@example.com>', 'Héllo', 'me@example.com', 'Plain body',
+            html_body='<p>HTML body</p>', cc='cc@example.com'
+        )
+        message = email.message_from_bytes(raw, policy=policy.default)
+        
+        self.assertEqual(message['To'], 'Jöhn <john@example.com>')
+        self.assertEqual(message['Subject'], 'Héllo')
+        self.assertEqual(message['Cc'], 'cc@example.com')
+        self.assertEqual(message.get_content_type(), 'multipart/alternative')
+        self.assertEqual(message.get_body(('plain',)).get_content().strip(), 'Plain body')
+        self.assertEqual(message.get_body(('html',)).get_content().strip(), '<p>HTML body</p>')
+
+    def test_build_raw_message_folds_long_headers_with_crlf(self):
+        """Test that long encoded headers fold with CRLF and stay under the line limit"""
+        import email
+        import re
+        from email import policy
+        from gmail_server import build_raw_message
+        
+        to = ', '.join(f'user{i}@example.com' for i in range(100))
+        subject = 'Héllo wörld ' * 20
+        raw = build_raw_message(to, subject, 'me@example.com', 'Body')
+        headers = raw.split(b'\r\n\r\n', 1)[0]
+        
+        self.assertIsNone(re.search(rb'(?<!\r)\n', headers))
+        self.assertTrue(all(len(line) <= 998 for line in headers.split(b'\r\n')))
+        message = email.message_from_bytes(raw, policy=policy.default)
+        self.assertEqual(message['Subject'], subject)
+        self.assertEqual(len(message['To'].addresses), 100)
+    
+    @patch('gmail_server.get_profile')
+    def test_get_from_email_is_cached(self, mock_get_profile):
+        """Test that the sender address is fetched only once"""
+        import gmail_server
+        gmail_server._FROM_EMAIL = None
+        mock_get_profile.return_value = {'emailAddress': 'me@example.com'}
+        
+        service = MagicMock()
+        self.assertEqual(gmail_server.get_from_email(service), 'me@example.com')
+        self.assertEqual(gmail_server.get_from_email(service), 'me@example.com')
+        
+        mock_get_profile.assert_called_once_with(service)
+        gmail_server._FROM_EMAIL = None
+    
+    def test_format_date(self):
+        """Test RFC 2822 date formatting and fallback"""
+        from gmail_server import _format_date
+        self.assertEqual(_format_date('Mon, 1 Jan 2024 10:30:00 +0000'), '2024-01-01 10:30')
+        self.assertEqual(_format_date('1 Jan 2024 10:30:00 +0000'), '2024-01-01 10:30')
+        self.assertEqual(_format_date('Mon, 1 Jan 24 10:30:00 -0000 (UTC)'), '2024-01-01 10:30')
+        self.assertEqual(_format_date('Mon, 1 Jan 2024 10:30:00 EST'), '2024-01-01 10:30')
+        self.assertEqual(_format_date('Unknown Date'), 'Unknown Date')
+    
+    def test_build_plain_raw_matches_general_builder(self):
+        """Test that the plain-text fast path produces the same message"""
+        from gmail_server import _build_plain_raw, build_raw_message
+        args = ('to@example.com', 'Subject', 'me@example.com', 'Line 1\nLine 2')
+        self.assertEqual(_build_plain_raw(*args), bytes(build_raw_message(*args)))
+    
+    @patch('gmail_server.get_gmail_service')
+    def test_send_draft_not_found(self, mock_get_service):
+        """Test that a 404 from drafts.send is reported as a missing draft"""
+        from googleapiclient.errors import HttpError
+        from gmail_server import send_draft
+        mock_service = MagicMock()
+        mock_get_service.return_value = mock_service
+        resp = MagicMock(status=404)
+        mock_service.users().drafts().send().execute.side_effect = HttpError(resp, b'')
+        
+        import asyncio
+        result = asyncio.run(send_draft(draft_id='missing'))
+        
+        self.assertEqual(result, 'Draft with ID missing not found')
+        mock_service.users().drafts().get.assert_not_called()
+    
+    @patch('gmail_server.get_gmail_service')
+    @patch('gmail_server.get_draft')
+    @patch('gmail_server.update_draft')
+    def test_update_email_draft_keeps_body(self, mock_update_draft, mock_get_draft, mock_get_service):
+        """Test that a header-only draft update leaves the body untouched"""
+        import asyncio
+        import gmail_server
+        from gmail_server import update_email_draft, build_raw_message
+        raw = bytes(build_raw_message('old@example.com', 'Hello', 'me@example.com', 'Original body'))
+        mock_get_draft.return_value = {'message': {'raw': gmail_server._b64.urlsafe_b64encode(raw).decode()}}
+        mock_update_draft.return_value = {'id': 'draft123'}
+        
+        result = asyncio.run(update_email_draft(draft_id='draft123', to='new@example.com'))
+        
+        self.assertIn("Draft 'Hello' (ID: draft123) updated successfully", result)
+        mock_get_draft.assert_called_once_with(mock_get_service.return_value, 'draft123', format='raw')
+        updated = gmail_server._b64.urlsafe_b64decode(mock_update_draft.call_args[0][2]['raw'])
+        self.assertIn(b'To: new@example.com', updated)
+        self.assertNotIn(b'old@example.com', updated)
+        self.assertTrue(updated.endswith(b'Original body'))
+    
+    @patch('gmail_server.HTMLParser', None)
+    def test_html_to_text(self):
+        """Test the regex HTML fallback conversion, including an unclosed tag"""
+        from gmail_server import _html_to_text
+        self.assertEqual(
+            _html_to_text('<p>Hello&nbsp;<b>world</b></p>A &lt;tag&gt; &amp;amp; &#39;q&#x27;'),
+            "Hello world\nA <tag> &amp; 'q'"
+        )
+        unclosed = '<' + 'a' * 100000
+        self.assertEqual(_html_to_text(unclosed), unclosed)
+    
+    def test_text_part_keeps_trailing_newline_and_form_feeds(self):
+        """Test that 7bit text parts only normalize real line breaks"""
+        from gmail_server import _encode_text_part
+        
+        part = _encode_text_part('a\nb\r\nc\x0cd\n', b'plain')
+        
+        self.assertTrue(part.endswith(b'\r\n\r\na\r\nb\r\nc\x0cd\r\n'))
+    
+    def test_extract_body_prefers_plain_text(self):
+        """Test body extraction from a nested multipart payload"""
+        import base64
+        from gmail_server import _extract_body_and_attachments
+        encode = lambda text: base64.urlsafe_b64encode(text.encode()).decode()
+        payload = {'mimeType': 'multipart/mixed', 'parts': [
+            {'mimeType': 'multipart/alternative', 'parts': [
+                {'mimeType': 'text/plain', 'body': {'data': encode('Plain body')}},
+                {'mimeType': 'text/html', 'body': {'data': encode('<p>HTML body</p>')}},
+            ]},
+            {'mimeType': 'application/pdf', 'filename': 'report.pdf',
+             'body': {'attachmentId': 'att1', 'size': 2048}},
+        ]}
+        
+        body, attachments = _extract_body_and_attachments(payload)
+        
+        self.assertEqual(body, 'Plain body')
+        self.assertEqual(attachments, [
+            {'filename': 'report.pdf', 'mimeType': 'application/pdf', 'size': '2.00 KB'}
+        ])
+    
+    @patch('gmail_server.thread_authorized_http')
+    @patch('gmail_server.get_message')
+    @patch('gmail_server.get_messages_batch')
+    def test_fetch_messages_retries_missing(self, mock_get_messages_batch, mock_get_message, mock_http):
+        """Test that messages missing from the batch are fetched individually"""
+        import asyncio
+        from gmail_server import fetch_messages
+        mock_get_messages_batch.return_value = [{'id': 'a'}, None, {'id': 'c'}]
+        mock_get_message.return_value = {'id': 'b'}
+        
+        result = asyncio.run(fetch_messages(MagicMock(), ['a', 'b', 'c']))
+        
+        self.assertEqual(result, [{'id': 'a'}, {'id': 'b'}, {'id': 'c'}])
+        self.assertEqual(mock_get_message.call_count, 1)
+        self.assertEqual(mock_get_message.call_args[0][1], 'b')
+    
+    @patch('gmail_server.get_gmail_service')
+    @patch('gmail_server.get_message')
+    @patch('gmail_server.modify_message')
+    def test_mark_as_read_single_request(self, mock_modify_message, mock_get_message, mock_get_service):
+        """Test that marking as read skips the existence check and maps 404"""
+        import asyncio
+        from googleapiclient.errors import HttpError
+        from gmail_server import mark_as_read
+        
+        result = asyncio.run(mark_as_read(message_id='msg1'))
+        self.assertEqual(result, 'Message msg1 marked as read')
+        mock_get_message.assert_not_called()
+        
+        mock_modify_message.side_effect = HttpError(MagicMock(status=404), b'')
+        result = asyncio.run(mark_as_read(message_id='missing'))
+        self.assertEqual(result, 'Message with ID missing not found.')
+    
+    def test_format_size(self):
+        """Test human-readable size formatting"""
+        from gmail_server import _format_size
+        self.assertEqual(_format_size(512), '512 bytes')
+        self.assertEqual(_format_size(1024), '1.00 KB')
+        self.assertEqual(_format_size(5 * 1024 * 1024), '5.00 MB')
+        self.assertEqual(_format_size(15 * 1024 ** 3), '15.00 GB')
+    
+    def test_iter_parts_walks_nested_parts(self):
+        """Test that the MIME walker reaches nested attachment parts"""
+        from gmail_server import _iter_parts
+        payload = {'parts': [
+            {'parts': [{'mimeType': 'text/plain'}, {'mimeType': 'text/html'}]},
+            {'parts': [{'filename': 'report.pdf'}]},
+        ]}
+        
+        self.assertEqual(len(list(_iter_parts(payload))), 6)
+        self.assertTrue(any(part.get('filename') for part in _iter_parts(payload)))
+
 
 if __name__ == '__main__':
     unittest.main()
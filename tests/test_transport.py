@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for the HTTP/2 transport
+"""
+
+import gzip
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add parent directory to path for importing utility modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httplib2
+from utils.transport import Http2Transport, httpx
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class TestHttp2Transport(unittest.TestCase):
+    """Test cases for Http2Transport"""
+    
+    def make_transport(self, handler):
+        client = httpx.Client(transport=httpx.MockTransport(handler))
+        self.addCleanup(client.close)
+        with patch('utils.transport._get_client', return_value=client):
+            return Http2Transport(timeout=5)
+    
+    def test_request_returns_decoded_body_without_encoding_headers(self):
+        """Test that a gzipped response is returned decoded, without the headers describing the encoding"""
+        body = b'{"id": "abc"}'
+        transport = self.make_transport(lambda request: httpx.Response(
+            200, content=gzip.compress(body), headers={'Content-Encoding': 'gzip', 'X-Test': 'yes'}
+        ))
+        
+        response, content = transport.request('https://gmail.googleapis.com/gmail/v1/users/me/profile')
+        
+        self.assertEqual(content, body)
+        self.assertEqual(response['status'], '200')
+        self.assertEqual(response['x-test'], 'yes')
+        self.assertNotIn('content-encoding', response)
+        self.assertNotIn('content-length', response)
+    
+    def test_request_errors_are_httplib2_errors(self):
+        """Test that timeouts and connection failures surface as httplib2 errors"""
+        for error, builtin in ((httpx.ConnectTimeout, TimeoutError), (httpx.ConnectError, ConnectionError)):
+            def handler(request):
+                raise error('failed', request=request)
+            
+            transport = self.make_transport(handler)
+            with self.assertRaises(httplib2.HttpLib2Error) as raised:
+                transport.request('https://gmail.googleapis.com/')
+            self.assertIsInstance(raised.exception, builtin)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,94 +2,210 @@
 """
 Simple tunnel script using various services
 """
-import subprocess
+import asyncio
+import sys
 import time
 import requests
 import json
 
-def try_localtunnel():
-    """Try localtunnel"""
+# Seconds to wait for localtunnel to print its URL
+LOCALTUNNEL_TIMEOUT = 15
+
+# Backoff between polls of ngrok's local API while it starts up
+NGROK_POLL_DELAYS = (0.02, 0.04, 0.08, 0.16, 0.32, 0.5, 1.0, 1.0, 1.0, 1.0)
+
+# (connect, read) timeouts for a single ngrok API request
+NGROK_API_TIMEOUT = (0.1, 0.5)
+
+async def wait_for_marker(stream, marker, timeout):
+    """
+    Read lines from a subprocess stream until one containing marker appears
+    
+    Args:
+        stream: asyncio StreamReader of the process output
+        marker: Bytes to look for, e.g. b'your url is:'
+        timeout: Seconds to wait before giving up
+    
+    Returns:
+        The rest of the line after the marker, or None if it never appeared
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return None
+        try:
+            line = await asyncio.wait_for(stream.readline(), remaining)
+        except asyncio.TimeoutError:
+            return None
+        if not line:
+            return None
+        start = line.find(marker)
+        if start != -1:
+            return line[start + len(marker):].decode('utf-8', errors='replace').strip()
+
+async def try_localtunnel():
+    """
+    Try localtunnel
+    
+    Returns:
+        Tuple of (url or None, process or None)
+    """
+    process = None
     try:
         print("Trying localtunnel...")
-        process = subprocess.Popen(['npx', 'localtunnel', '--port', '8000'], 
-                                 stdout=subprocess.PIPE, 
-                                 stderr=subprocess.PIPE, 
-                                 text=True)
+        # stderr is merged into stdout so a single reader drains both
+        process = await asyncio.create_subprocess_exec(
+            'npx', 'localtunnel', '--port', '8000',
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT)
         
-        # Wait a bit for it to start
-        time.sleep(5)
+        url = await wait_for_marker(process.stdout, b'your url is:', LOCALTUNNEL_TIMEOUT)
+        if url:
+            print(f"Localtunnel URL: {url}")
+            return url, process
         
-        # Try to get the URL from the output
-        try:
-            stdout, stderr = process.communicate(timeout=2)
-            print("Localtunnel output:", stdout)
-            print("Localtunnel error:", stderr)
-        except subprocess.TimeoutExpired:
-            # Process is still running, which is good
-            print("Localtunnel is running...")
-            return True
+        if process.returncode is not None:
+            print(f"Localtunnel exited with code {process.returncode}")
+        else:
+            print("Localtunnel did not report a URL")
+        return None, process
+    except asyncio.CancelledError:
+        stop_process(process)
+        raise
     except Exception as e:
         print(f"Localtunnel failed: {e}")
-        return False
+        return None, process
+
+def get_ngrok_url():
+    """
+    Poll ngrok's local API until it reports a tunnel
+    
+    Returns:
+        The public URL of the first tunnel, or None if none appeared in time
+    """
+    with requests.Session() as session:
+        for delay in NGROK_POLL_DELAYS:
+            try:
+                response = session.get('http://localhost:4040/api/tunnels', timeout=NGROK_API_TIMEOUT)
+                if response.status_code == 200:
+                    data = response.json()
+                    if 'tunnels' in data and len(data['tunnels']) > 0:
+                        return data['tunnels'][0]['public_url']
+            except (requests.ConnectionError, requests.Timeout):
+                # API not up yet
+                pass
+            except ValueError:
+                # Response was not JSON
+                pass
+            time.sleep(delay)
+    return None
 
-def try_ngrok():
-    """Try ngrok"""
+async def try_ngrok():
+    """
+    Try ngrok
+    
+    Returns:
+        Tuple of (url or None, process or None)
+    """
+    process = None
     try:
         print("Trying ngrok...")
-        process = subprocess.Popen(['./ngrok', 'http', '8000'], 
-                                 stdout=subprocess.PIPE, 
-                                 stderr=subprocess.PIPE, 
-                                 text=True)
-        
-        # Wait for ngrok to start
-        time.sleep(3)
+        # The URL comes from ngrok's local API; its console output is never
+        # read, so it must not go to a pipe that could fill up and block ngrok
+        process = await asyncio.create_subprocess_exec(
+            './ngrok', 'http', '8000',
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL)
         
-        # Try to get the URL from ngrok's API
-        try:
-            response = requests.get('http://localhost:4040/api/tunnels')
-            if response.status_code == 200:
-                data = response.json()
-                if 'tunnels' in data and len(data['tunnels']) > 0:
-                    url = data['tunnels'][0]['public_url']
-                    print(f"Ngrok URL: {url}")
-                    return url
-        except:
-            pass
-            
-        return True
+        # requests is blocking, so poll from a worker thread
+        url = await asyncio.to_thread(get_ngrok_url)
+        if url:
+            print(f"Ngrok URL: {url}")
+        return url, process
+    except asyncio.CancelledError:
+        stop_process(process)
+        raise
     except Exception as e:
         print(f"Ngrok failed: {e}")
-        return False
+        return None, process
+
+async def drain(stream):
+    """Pass a tunnel's remaining output through so its pipe never fills up"""
+    while True:
+        chunk = await stream.read(8192)
+        if not chunk:
+            return
+        sys.stdout.buffer.write(chunk)
+        sys.stdout.flush()
+
+def stop_process(process):
+    """Terminate a tunnel process if it is still running"""
+    if process is not None and process.returncode is None:
+        try:
+            process.terminate()
+        except ProcessLookupError:
+            pass
+
+async def establish_tunnel():
+    """
+    Start ngrok and localtunnel together and keep whichever reports a URL first
+    
+    Returns:
+        Tuple of (url, process) for the winner, or (None, None) if both failed
+    """
+    pending = {asyncio.create_task(try_ngrok()), asyncio.create_task(try_localtunnel())}
+    finished = []
+    winner = (None, None)
+    
+    try:
+        while pending and winner[0] is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                url, process = task.result()
+                finished.append(process)
+                if url and winner[0] is None:
+                    winner = (url, process)
+    finally:
+        # Cancelling a still-running candidate terminates its process
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for process in finished:
+            if process is not winner[1]:
+                stop_process(process)
+    
+    return winner
+
+async def run_tunnel():
+    """Bring up a tunnel and keep it open until it exits or is cancelled"""
+    url, process = await establish_tunnel()
+    if not url:
+        print("❌ Could not establish tunnel")
+        return
+    
+    print(f"\n✅ Public URL: {url}/sse")
+    print("Press Ctrl+C to stop the tunnel")
+    # localtunnel's output is still piped after its URL was read; keep reading
+    # it, or a full pipe would block the tunnel
+    drainer = asyncio.create_task(drain(process.stdout)) if process.stdout is not None else None
+    try:
+        await process.wait()
+    finally:
+        stop_process(process)
+        if drainer is not None:
+            drainer.cancel()
 
 def main():
     print("Setting up public tunnel for Gmail MCP Server...")
     print("Server is running on http://localhost:8000/sse")
     
-    # Try ngrok first
-    ngrok_result = try_ngrok()
-    if ngrok_result and isinstance(ngrok_result, str):
-        print(f"\n✅ Public URL: {ngrok_result}/sse")
-        print("Press Ctrl+C to stop the tunnel")
-        try:
-            while True:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            print("\nStopping tunnel...")
-            return
-    
-    # Try localtunnel
-    if try_localtunnel():
-        print("\n✅ Localtunnel started")
-        print("Check the output above for the public URL")
-        print("Press Ctrl+C to stop the tunnel")
-        try:
-            while True:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            print("\nStopping tunnel...")
-            return
-    
-    print("❌ Could not establish tunnel")
+    try:
+        asyncio.run(run_tunnel())
+    except KeyboardInterrupt:
+        print("\nStopping tunnel...")
 
 if __name__ == "__main__":
     main()
@@ -9,13 +9,42 @@ token management, security, and error handling.
 import os
 import logging
 import json
-import pickle
+import hashlib
+import stat
+import tempfile
+import threading
+import functools
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+import httplib2
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
+from googleapiclient.model import JsonModel
+from utils.transport import Http2Transport, http2_enabled
+try:
+    # Faster JSON parser that accepts bytes directly
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+class FastJsonModel(JsonModel):
+    """
+    JsonModel that parses API responses with orjson when it is installed
+    
+    Every execute() and batch callback goes through deserialize(), so this
+    speeds up decoding of all Gmail responses, e.g. large 'full' messages.
+    """
+    
+    def deserialize(self, content):
+        body = json_loads(content)
+        if self._data_wrapper and 'data' in body:
+            body = body['data']
+        return body
 
 # Set up logging
 logger = logging.getLogger("gmail_auth")
@@ -33,6 +62,43 @@ SCOPES = [
 DEFAULT_CREDENTIALS_PATH = 'credentials.json'
 DEFAULT_TOKEN_PATH = 'token.json'
 
+# Socket timeout (seconds) for Gmail API connections
+HTTP_TIMEOUT = 5
+
+# Per-thread authorized connections, kept open between requests
+_THREAD_HTTP = threading.local()
+
+# (credentials, service) from the last successful get_gmail_service() call
+_SERVICE_CACHE = None
+_SERVICE_LOCK = threading.Lock()
+
+# Short-lived access tokens shared between invocations on the same container,
+# kept in a private per-user directory with one file per client and refresh token
+ACCESS_TOKEN_CACHE_DIR = os.path.join(
+    tempfile.gettempdir(), f"gmail-mcp-{os.getuid() if hasattr(os, 'getuid') else 'user'}"
+)
+# Only reuse a cached access token with at least this much lifetime left
+ACCESS_TOKEN_MIN_TTL = timedelta(seconds=60)
+
+# File paths, resolved from the environment once at import time
+TOKEN_PATH = DEFAULT_TOKEN_PATH
+CREDENTIALS_PATH = DEFAULT_CREDENTIALS_PATH
+
+def reload_paths():
+    """
+    Re-read the token and credentials paths from environment variables
+    
+    Call this after changing GMAIL_TOKEN_PATH or GMAIL_CREDENTIALS_PATH
+    at runtime (e.g. in tests); the cached service is dropped as well.
+    """
+    global TOKEN_PATH, CREDENTIALS_PATH, _SERVICE_CACHE
+    TOKEN_PATH = os.environ.get('GMAIL_TOKEN_PATH', DEFAULT_TOKEN_PATH)
+    CREDENTIALS_PATH = os.environ.get('GMAIL_CREDENTIALS_PATH', DEFAULT_CREDENTIALS_PATH)
+    with _SERVICE_LOCK:
+        _SERVICE_CACHE = None
+
+reload_paths()
+
 def get_token_path():
     """
     Get token path from environment variable or use default
@@ -40,7 +106,7 @@ def get_token_path():
     Returns:
         Path to token file
     """
-    return os.environ.get('GMAIL_TOKEN_PATH', DEFAULT_TOKEN_PATH)
+    return TOKEN_PATH
 
 def get_credentials_path():
     """
@@ -49,7 +115,19 @@ def get_credentials_path():
     Returns:
         Path to credentials file
     """
-    return os.environ.get('GMAIL_CREDENTIALS_PATH', DEFAULT_CREDENTIALS_PATH)
+    return CREDENTIALS_PATH
+
+def get_token_mtime():
+    """
+    Get the modification time of the token file
+    
+    Returns:
+        The mtime in nanoseconds, or None if the file does not exist
+    """
+    try:
+        return os.stat(TOKEN_PATH).st_mtime_ns
+    except OSError:
+        return None
 
 def load_credentials():
     """
@@ -70,21 +148,9 @@ def load_credentials():
     credentials_path = get_credentials_path()
     
     try:
-        with open(credentials_path, 'r') as f:
-            credentials_data = json.load(f)
-            
-        if 'installed' in credentials_data:
-            client_id = credentials_data['installed']['client_id']
-            client_secret = credentials_data['installed']['client_secret']
-            return client_id, client_secret
-        elif 'web' in credentials_data:
-            client_id = credentials_data['web']['client_id']
-            client_secret = credentials_data['web']['client_secret']
-            return client_id, client_secret
-        else:
-            logger.error(f"Unexpected credentials format in {credentials_path}")
-            return None, None
-            
+        # Keyed on mtime so the file is only parsed again after it changes
+        mtime = os.stat(credentials_path).st_mtime_ns
+        return _load_credentials_file(credentials_path, mtime)
     except FileNotFoundError:
         logger.error(f"Credentials file not found: {credentials_path}")
         return None, None
@@ -95,73 +161,392 @@ def load_credentials():
         logger.error(f"Error loading credentials: {str(e)}")
         return None, None
 
+@functools.lru_cache(maxsize=1)
+def _load_credentials_file(credentials_path, mtime):
+    """
+    Parse client ID and secret from a credentials file
+    
+    Args:
+        credentials_path: Path to the credentials file
+        mtime: Modification time of the file, used only as a cache key
+    
+    Returns:
+        Client ID and client secret as tuple
+    """
+    with open(credentials_path, 'rb') as f:
+        credentials_data = json_loads(f.read())
+    
+    if 'installed' in credentials_data:
+        return credentials_data['installed']['client_id'], credentials_data['installed']['client_secret']
+    elif 'web' in credentials_data:
+        return credentials_data['web']['client_id'], credentials_data['web']['client_secret']
+    else:
+        logger.error(f"Unexpected credentials format in {credentials_path}")
+        return None, None
+
+def _access_token_cache_key(creds):
+    """
+    Identify the account and client an access token belongs to
+    
+    Args:
+        creds: Credentials with a refresh token
+    
+    Returns:
+        Hex digest of (client_id, refresh_token)
+    """
+    identity = f"{creds.client_id}\0{creds.refresh_token}".encode('utf-8')
+    return hashlib.sha256(identity).hexdigest()
+
+def _access_token_cache_dir():
+    """
+    Get the private access token cache directory, creating it if needed
+    
+    Returns:
+        The directory path, or None if it is missing permissions we can trust
+    """
+    try:
+        os.mkdir(ACCESS_TOKEN_CACHE_DIR, 0o700)
+    except FileExistsError:
+        pass
+    except OSError as e:
+        logger.warning(f"Failed to create access token cache directory: {str(e)}")
+        return None
+    
+    # Refuse a directory (or symlink) someone else planted at the same path
+    try:
+        info = os.lstat(ACCESS_TOKEN_CACHE_DIR)
+    except OSError:
+        return None
+    if not stat.S_ISDIR(info.st_mode) or info.st_mode & 0o077:
+        logger.warning(f"Ignoring insecure access token cache directory {ACCESS_TOKEN_CACHE_DIR}")
+        return None
+    if hasattr(os, 'getuid') and info.st_uid != os.getuid():
+        logger.warning(f"Ignoring access token cache directory owned by another user: {ACCESS_TOKEN_CACHE_DIR}")
+        return None
+    return ACCESS_TOKEN_CACHE_DIR
+
+def load_cached_access_token(creds):
+    """
+    Apply a previously refreshed access token to credentials, if still fresh
+    
+    Only a token cached for the same client and refresh token is used.
+    
+    Args:
+        creds: Credentials whose access token has expired
+    
+    Returns:
+        True if a cached access token was applied
+    """
+    cache_dir = _access_token_cache_dir()
+    if cache_dir is None:
+        return False
+    key = _access_token_cache_key(creds)
+    
+    try:
+        fd = os.open(os.path.join(cache_dir, f'{key}.json'), os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+        with os.fdopen(fd, 'r') as f:
+            cached = json.load(f)
+        if cached['key'] != key:
+            return False
+        expiry = datetime.fromisoformat(cached['expiry'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+    
+    # google-auth keeps expiry as a naive UTC datetime
+    if expiry.replace(tzinfo=timezone.utc) - ACCESS_TOKEN_MIN_TTL <= datetime.now(timezone.utc):
+        return False
+    
+    creds.token = cached['token']
+    creds.expiry = expiry
+    logger.info("Using cached access token")
+    return True
+
+def save_cached_access_token(creds):
+    """
+    Persist a freshly refreshed access token for other invocations
+    
+    The file is created with owner-only permissions and moved into place
+    atomically, so readers never see a partial write.
+    
+    Args:
+        creds: Credentials that were just refreshed
+    """
+    if not creds.token or not creds.expiry or not creds.refresh_token:
+        return
+    cache_dir = _access_token_cache_dir()
+    if cache_dir is None:
+        return
+    key = _access_token_cache_key(creds)
+    path = os.path.join(cache_dir, f'{key}.json')
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    
+    try:
+        fd = os.open(
+            temp_path,
+            os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_NOFOLLOW', 0),
+            0o600
+        )
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'key': key, 'token': creds.token, 'expiry': creds.expiry.isoformat()}, f)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"Failed to cache access token: {str(e)}")
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+def new_http():
+    """
+    Create the underlying connection for Gmail API requests
+    
+    Returns:
+        An HTTP/2 transport when GMAIL_HTTP2 is enabled, else an httplib2.Http
+    """
+    if http2_enabled():
+        return Http2Transport(timeout=HTTP_TIMEOUT)
+    return httplib2.Http(timeout=HTTP_TIMEOUT)
+
+def new_authorized_http(service):
+    """
+    Create a separate authorized connection for a Gmail service's credentials
+    
+    httplib2 connections are not thread-safe, so requests executed
+    concurrently from worker threads must each use their own.
+    
+    Args:
+        service: Gmail API service instance
+    
+    Returns:
+        An AuthorizedHttp sharing the service's credentials
+    """
+    return AuthorizedHttp(service._http.credentials, http=new_http())
+
+def thread_authorized_http(service):
+    """
+    Get the calling thread's authorized connection for a Gmail service
+    
+    The connection is created on first use and reused by later requests
+    from the same thread, so worker threads keep their TLS sessions alive
+    instead of reconnecting for every call.
+    
+    Args:
+        service: Gmail API service instance
+    
+    Returns:
+        An AuthorizedHttp sharing the service's credentials
+    """
+    http = getattr(_THREAD_HTTP, 'http', None)
+    if http is None or http.credentials is not service._http.credentials:
+        http = new_authorized_http(service)
+        _THREAD_HTTP.http = http
+    return http
+
+@functools.lru_cache(maxsize=1)
+def get_discovery_document():
+    """
+    Load the Gmail discovery document bundled with google-api-python-client
+    
+    Read once per process so rebuilding the service (e.g. after a failed
+    health check) does not hit the filesystem again.
+    
+    Returns:
+        The discovery document as a JSON string, or None if it is not bundled
+    """
+    return get_static_doc('gmail', 'v1')
+
 def get_gmail_service():
     """
     Authenticate and return a Gmail API service instance.
     
     This function handles the OAuth 2.0 flow for Gmail API authentication.
     It looks for existing credentials in token.json, refreshes them if needed,
-    or initiates a new authentication flow if no valid credentials exist.
+    or initiates a new authentication flow if no valid credentials exist
+    (unless GMAIL_INTERACTIVE_AUTH is false, in which case it raises instead).
+    
+    The service is built once and reused while its credentials are valid
+    or can be refreshed in place by the authorized connection, and the
+    token file has not been replaced on disk since it was loaded.
     
     Returns:
         A Gmail API service instance
     """
-    creds = None
+    global _SERVICE_CACHE
+    
+    with _SERVICE_LOCK:
+        token_mtime = get_token_mtime()
+        if _SERVICE_CACHE is not None:
+            creds, service, cached_mtime = _SERVICE_CACHE
+            if cached_mtime == token_mtime and (creds.valid or creds.refresh_token):
+                return service
+        
+        creds, service = _create_gmail_service()
+        # The token may have just been (re)written, so stat it again
+        _SERVICE_CACHE = (creds, service, get_token_mtime())
+        return service
+
+def save_token(creds, token_path=None):
+    """
+    Write credentials to the token file as JSON
+    
+    Args:
+        creds: The credentials to save
+        token_path: Where to write them (default: the configured token path)
+    """
+    token_path = token_path or get_token_path()
+    
+    # Create directory if it doesn't exist
+    token_dir = os.path.dirname(token_path)
+    if token_dir and not os.path.exists(token_dir):
+        os.makedirs(token_dir)
+    
+    with open(token_path, 'w') as token:
+        token.write(creds.to_json())
+    logger.info(f"Saved authentication token to {token_path}")
+
+def _load_token(token_path):
+    """
+    Load credentials from the token file
+    
+    Only the JSON format written by Credentials.to_json() is accepted; a
+    pickled token left by older versions must be converted first with
+    'python -m utils.auth --migrate'.
+    
+    Args:
+        token_path: Path to the token file
+    
+    Returns:
+        The stored credentials
+    
+    Raises:
+        FileNotFoundError: If there is no token file
+        ValueError: If the file does not hold JSON credentials
+    """
+    try:
+        with open(token_path, 'rb') as token:
+            logger.info(f"Loading existing token from {token_path}")
+            return Credentials.from_authorized_user_info(json_loads(token.read()), SCOPES)
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"Token file not found: {token_path}. Run 'python -m utils.auth' to authenticate."
+        )
+    except ValueError as e:
+        raise ValueError(
+            f"Invalid token file {token_path} ({str(e)}). If it was saved by an older "
+            f"version, convert it with 'python -m utils.auth --migrate'; otherwise run "
+            f"'python -m utils.auth' to authenticate again."
+        ) from e
+
+def migrate_token(token_path=None):
+    """
+    Convert a pickled token file left by older versions to JSON
+    
+    Unpickling runs code from the file, so this is only done on request from
+    the command line, never when the server loads its token.
+    
+    Args:
+        token_path: The token file (default: the configured token path)
+    
+    Returns:
+        The migrated credentials
+    
+    Raises:
+        ValueError: If the file does not hold pickled credentials
+    """
+    import pickle
+    
+    token_path = token_path or get_token_path()
+    with open(token_path, 'rb') as token:
+        creds = pickle.load(token)
+    if not isinstance(creds, Credentials):
+        raise ValueError(f"Token file {token_path} does not hold pickled credentials")
+    
+    save_token(creds, token_path)
+    logger.info(f"Converted pickled token in {token_path} to JSON")
+    return creds
+
+def interactive_auth_enabled():
+    """
+    Check whether the server may open a browser to log in
+    
+    Returns:
+        False if GMAIL_INTERACTIVE_AUTH is set to a false value, e.g. on a
+        headless host where a missing token should fail fast instead
+    """
+    return os.environ.get('GMAIL_INTERACTIVE_AUTH', 'true').lower() in ('1', 'true', 'yes')
+
+def _create_gmail_service():
+    """
+    Load or obtain credentials and build a Gmail API service
+    
+    Returns:
+        Tuple of (credentials, Gmail API service instance)
+    """
     token_path = get_token_path()
+    interactive = interactive_auth_enabled()
     
     try:
         # The file token.json stores the user's access and refresh tokens
-        if os.path.exists(token_path):
-            logger.info(f"Loading existing token from {token_path}")
-            
-            try:
-                with open(token_path, 'rb') as token:
-                    creds = pickle.load(token)
-            except Exception as e:
-                logger.warning(f"Failed to load token from {token_path}: {str(e)}")
+        try:
+            creds = _load_token(token_path)
+        except FileNotFoundError:
+            if not interactive:
+                raise
+            creds = None
+        
+        # Skip the refresh round trip if another invocation already refreshed
+        if creds and creds.expired and creds.refresh_token:
+            load_cached_access_token(creds)
         
-        # If there are no (valid) credentials available, let the user log in
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
+        if creds and not creds.valid:
+            try:
+                if not creds.refresh_token:
+                    raise ValueError(
+                        f"Token in {token_path} has expired and cannot be refreshed. "
+                        f"Run 'python -m utils.auth' to authenticate again."
+                    )
                 logger.info("Refreshing expired credentials")
                 try:
                     creds.refresh(Request())
                 except Exception as e:
-                    logger.warning(f"Error refreshing credentials: {str(e)}")
-                    creds = None
-            
-            # If still no valid credentials, initiate OAuth flow
-            if not creds:
-                logger.info("Initiating OAuth authentication flow")
+                    raise ValueError(
+                        f"Error refreshing credentials: {str(e)}. "
+                        f"Run 'python -m utils.auth' to authenticate again."
+                    ) from e
+            except ValueError as e:
+                if not interactive:
+                    raise
+                logger.warning(str(e))
+                creds = None
+            else:
+                save_cached_access_token(creds)
                 
-                # Load client secrets from credentials.json file
-                credentials_path = get_credentials_path()
+                # Save the credentials for the next run
                 try:
-                    flow = InstalledAppFlow.from_client_secrets_file(credentials_path, SCOPES)
-                except FileNotFoundError:
-                    raise FileNotFoundError(f"Credentials file not found: {credentials_path}")
-                
-                # Run local server to handle auth flow
-                creds = flow.run_local_server(port=0)
-            
-            # Save the credentials for the next run
-            try:
-                # Create directory if it doesn't exist
-                token_dir = os.path.dirname(token_path)
-                if token_dir and not os.path.exists(token_dir):
-                    os.makedirs(token_dir)
-                    
-                with open(token_path, 'wb') as token:
-                    pickle.dump(creds, token)
-                logger.info(f"Saved authentication token to {token_path}")
-            except Exception as e:
-                logger.warning(f"Failed to save token to {token_path}: {str(e)}")
+                    save_token(creds, token_path)
+                except Exception as e:
+                    logger.warning(f"Failed to save token to {token_path}: {str(e)}")
         
-        # Build the Gmail service
+        # If still no valid credentials, let the user log in
+        if not creds:
+            creds = authenticate()
+        
+        # Build the Gmail service on a persistent connection so later calls
+        # reuse the same HTTPS session instead of repeating the TLS handshake
         try:
-            service = build('gmail', 'v1', credentials=creds)
+            http = AuthorizedHttp(creds, http=new_http())
+            # Use the discovery document bundled with google-api-python-client
+            # rather than downloading it from googleapis.com on every cold start
+            discovery_doc = get_discovery_document()
+            if discovery_doc:
+                service = build_from_document(discovery_doc, http=http, model=FastJsonModel())
+            else:
+                service = build(
+                    'gmail', 'v1', http=http, model=FastJsonModel(),
+                    cache_discovery=False, static_discovery=True
+                )
             logger.info("Gmail API service created successfully")
-            return service
+            return creds, service
         except Exception as e:
             logger.error(f"Error building Gmail service: {str(e)}")
             raise
@@ -169,3 +554,32 @@ def get_gmail_service():
     except Exception as e:
         logger.error(f"Authentication error: {str(e)}")
         raise
+
+def authenticate():
+    """
+    Run the interactive OAuth flow in a browser and save the resulting token
+    
+    Returns:
+        The new credentials
+    """
+    credentials_path = get_credentials_path()
+    try:
+        flow = InstalledAppFlow.from_client_secrets_file(credentials_path, SCOPES)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Credentials file not found: {credentials_path}")
+    
+    logger.info("Initiating OAuth authentication flow")
+    # Run local server to handle auth flow
+    creds = flow.run_local_server(port=0)
+    save_token(creds)
+    return creds
+
+if __name__ == '__main__':
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    if '--migrate' in sys.argv[1:]:
+        migrate_token()
+        print(f"Token converted to JSON in {get_token_path()}")
+    else:
+        authenticate()
+        print(f"Authentication complete; token saved to {get_token_path()}")
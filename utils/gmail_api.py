@@ -3,17 +3,220 @@
 Enhanced Gmail API Utilities
 
 This module provides comprehensive functions for interacting with the Gmail API.
+
+Every helper takes the service returned by utils.auth.get_gmail_service(),
+which is built once per process on a persistent connection; pass that shared
+service rather than building a new one per call, or each request pays for a
+fresh TCP and TLS handshake.
 """
 
-import base64
+import asyncio
+import copy
+import functools
+import inspect
 import logging
-from email.mime.text import MIMEText
+import queue
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from email.header import Header, decode_header, make_header
+from email.parser import BytesHeaderParser
+from email.utils import formataddr, getaddresses
 from googleapiclient.errors import HttpError
 from typing import Dict, List, Optional, Any, Union
+try:
+    # SIMD-accelerated drop-in replacement for the stdlib base64 functions
+    import pybase64 as _b64
+except ImportError:
+    import base64 as _b64
+from utils.auth import thread_authorized_http
 
 # Set up logging
 logger = logging.getLogger("gmail_api")
 
+# Maximum number of calls Gmail accepts in a single batch request
+BATCH_SIZE = 100
+
+# Batch requests executed concurrently when a fetch spans several batches
+BATCH_WORKERS = 5
+
+# Long-lived workers for batch and page fetches; each keeps its own
+# authorized connection alive between calls
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+def _get_executor():
+    """Get the module's shared worker pool, creating it on first use"""
+    global _EXECUTOR
+    
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix='gmail-api')
+        return _EXECUTOR
+
+# Statuses for which a whole batch request is retried with backoff
+BATCH_RETRY_STATUSES = (429, 500, 503)
+
+# Requests the async helpers keep in flight at once, per event loop
+ASYNC_CONCURRENCY = 10
+
+# Metadata/minimal message fetches are reused for this many seconds;
+# label changes and deletions made through this module evict them
+MESSAGE_CACHE_TTL = 60
+MESSAGE_CACHE_SIZE = 2048
+CACHEABLE_FORMATS = ('metadata', 'minimal')
+
+# get_message_batched waits this long for more calls to join a batch
+MICRO_BATCH_WAIT = 0.02
+MICRO_BATCH_SIZE = 50
+# Longest get_message_batched waits for its batch to answer
+MICRO_BATCH_TIMEOUT = 60
+
+# Largest page messages.list and threads.list will return
+MAX_PAGE_SIZE = 500
+
+# Seconds a fetched label list is reused before asking Gmail again
+LABEL_CACHE_TTL = 300
+
+# Maximum number of message IDs accepted by messages.batchModify and batchDelete
+BATCH_MODIFY_SIZE = 1000
+
+# Retries with exponential backoff when Gmail answers 429, 5xx or
+# 403 rateLimitExceeded; no time is spent waiting unless it pushes back
+NUM_RETRIES = 5
+
+# Partial-response field masks; listings only need the IDs
+MESSAGE_LIST_FIELDS = 'messages/id'
+MESSAGE_PAGE_FIELDS = 'messages/id,nextPageToken'
+# Enough of a metadata-format message to render listings and headers
+MESSAGE_METADATA_FIELDS = 'id,threadId,labelIds,payload(headers,filename,parts)'
+DRAFT_LIST_FIELDS = 'drafts(id,message/id)'
+
+# RFC 5322 hard limit on line length, excluding CRLF
+MAX_LINE_LENGTH = 998
+# Line length long header values are folded at, as RFC 5322 recommends
+FOLD_LINE_LENGTH = 78
+
+# Headers whose values are address lists; non-ASCII display names are
+# encoded per address so the addresses themselves stay readable
+_ADDRESS_HEADERS = frozenset(('To', 'From', 'Cc', 'Bcc'))
+
+# Marks gmail_call helpers that re-raise HttpError instead of returning a default
+_RAISE = object()
+
+def gmail_call(message, default=_RAISE):
+    """
+    Log HttpErrors raised by a Gmail API helper, then re-raise or return a default
+    
+    Args:
+        message: Log message; may name the helper's arguments, e.g.
+            'Error getting message {msg_id}'. It is only formatted on error.
+        default: Value returned (as a copy) instead of re-raising the error
+    
+    Returns:
+        The decorator
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except HttpError as error:
+                if logger.isEnabledFor(logging.ERROR):
+                    bound = signature.bind(*args, **kwargs)
+                    bound.apply_defaults()
+                    logger.error('%s: %s', message.format(**bound.arguments), error)
+                if default is _RAISE:
+                    raise
+                return copy.deepcopy(default)
+        
+        return wrapper
+    
+    return decorator
+
+@functools.lru_cache(maxsize=256)
+def _normalize_query_string(query):
+    """Collapse runs of whitespace in a search string"""
+    return ' '.join(query.split())
+
+def normalize_query(query):
+    """
+    Turn a search string or Query into the string sent to Gmail
+    
+    Args:
+        query: Gmail search string or Query
+    
+    Returns:
+        The search string with whitespace normalized
+    """
+    return _normalize_query_string(str(query))
+
+class Query:
+    """
+    Builder for Gmail search strings
+    
+    Example:
+        Query().from_('boss@example.com').after(date(2024, 1, 1)).is_('unread')
+    
+    The serialized string is cached until another term is added, so a
+    query kept around for polling is only rendered once.
+    """
+    
+    def __init__(self, text=None):
+        self._terms = [text] if text else []
+        self._built = None
+    
+    def _add(self, operator, value):
+        value = str(value)
+        if any(c.isspace() for c in value) and not value.startswith('"'):
+            value = f'"{value}"'
+        self._terms.append(f"{operator}:{value}")
+        self._built = None
+        return self
+    
+    def from_(self, sender):
+        return self._add('from', sender)
+    
+    def to(self, recipient):
+        return self._add('to', recipient)
+    
+    def subject(self, subject):
+        return self._add('subject', subject)
+    
+    def label(self, label):
+        return self._add('label', label)
+    
+    def is_(self, state):
+        return self._add('is', state)
+    
+    def has(self, what):
+        return self._add('has', what)
+    
+    def after(self, day):
+        # Gmail expects YYYY/MM/DD; dates and datetimes are converted
+        return self._add('after', day.strftime('%Y/%m/%d') if hasattr(day, 'strftime') else day)
+    
+    def before(self, day):
+        return self._add('before', day.strftime('%Y/%m/%d') if hasattr(day, 'strftime') else day)
+    
+    def text(self, text):
+        """Add free-form search text as-is"""
+        self._terms.append(str(text))
+        self._built = None
+        return self
+    
+    def build(self):
+        if self._built is None:
+            self._built = normalize_query(' '.join(self._terms))
+        return self._built
+    
+    __str__ = build
+
+@gmail_call('Error getting profile', default=None)
 def get_profile(service, user_id='me'):
     """
     Get user profile information
@@ -25,14 +228,10 @@ def get_profile(service, user_id='me'):
     Returns:
         User profile data
     """
-    try:
-        profile = service.users().getProfile(userId=user_id).execute()
-        return profile
-    
-    except HttpError as error:
-        logger.error(f'Error getting profile: {error}')
-        return None
+    profile = service.users().getProfile(userId=user_id).execute()
+    return profile
 
+@gmail_call('Error listing messages', default=[])
 def list_messages(service, user_id='me', max_results=10, query=None):
     """
     List email message IDs from Gmail inbox
@@ -46,26 +245,145 @@ def list_messages(service, user_id='me', max_results=10, query=None):
     Returns:
         List of message IDs
     """
-    try:
-        # Build request parameters
-        params = {
-            'userId': user_id, 
-            'maxResults': max_results
-        }
+    # A single page can't hold more; page through the rest
+    if max_results > MAX_PAGE_SIZE:
+        return list(iter_message_ids(service, query, user_id, limit=max_results))
+    
+    # Build request parameters
+    params = {
+        'userId': user_id, 
+        'maxResults': max_results,
+        'fields': MESSAGE_LIST_FIELDS
+    }
+    
+    if query:
+        params['q'] = normalize_query(query)
         
-        if query:
-            params['q'] = query
+    response = service.users().messages().list(**params).execute()
+    
+    messages = response.get('messages', [])
+    return [msg['id'] for msg in messages]
+
+def _iter_pages(service, make_request, key, page_size, limit=None):
+    """
+    Yield the items of a paginated list response
+    
+    The next page is requested from a worker thread as soon as its token is
+    known, so it downloads while the caller consumes the current page. No
+    page beyond the limit is requested.
+    
+    Args:
+        service: Gmail API service instance
+        make_request: Callable taking a page token (None for the first page)
+            and a page size, and returning the list request
+        key: Response field holding the items, e.g. 'messages'
+        page_size: Largest number of items to request per page
+        limit: Optional total number of items to yield
+    
+    Yields:
+        The items of every page in order
+    """
+    remaining = limit
+    
+    def size():
+        return page_size if remaining is None else min(page_size, remaining)
+    
+    def fetch(page_token, page_size):
+        # httplib2 connections are not thread-safe; use the worker's own
+        return make_request(page_token, page_size).execute(http=thread_authorized_http(service))
+    
+    if remaining is not None and remaining <= 0:
+        return
+    
+    next_page = None
+    try:
+        response = make_request(None, size()).execute()
+        while True:
+            items = response.get(key, [])
+            if remaining is not None:
+                items = items[:remaining]
+                remaining -= len(items)
             
-        response = service.users().messages().list(**params).execute()
-        
-        messages = response.get('messages', [])
-        return [msg['id'] for msg in messages]
+            page_token = response.get('nextPageToken')
+            next_page = None
+            if page_token and remaining != 0:
+                next_page = _get_executor().submit(fetch, page_token, size())
+            yield from items
+            if next_page is None:
+                return
+            response = next_page.result()
+    finally:
+        # Don't fetch a page for a caller that stopped early
+        if next_page is not None:
+            next_page.cancel()
+
+def iter_message_ids(service, query=None, user_id='me', page_size=MAX_PAGE_SIZE, limit=None):
+    """
+    Iterate over all message IDs matching a query, page by page
     
-    except HttpError as error:
-        logger.error(f'Error listing messages: {error}')
-        return []
+    Args:
+        service: Gmail API service instance
+        query: Optional search query
+        user_id: User's email address (default: 'me')
+        page_size: Number of IDs requested per page
+        limit: Optional maximum number of IDs to yield
+    
+    Yields:
+        Message IDs; stop iterating to stop fetching pages
+    """
+    messages = service.users().messages()
+    
+    def make_request(page_token, page_size):
+        params = {'userId': user_id, 'maxResults': page_size, 'fields': MESSAGE_PAGE_FIELDS}
+        if query:
+            params['q'] = normalize_query(query)
+        if page_token:
+            params['pageToken'] = page_token
+        return messages.list(**params)
+    
+    for msg in _iter_pages(service, make_request, 'messages', page_size, limit):
+        yield msg['id']
 
-def get_message(service, msg_id, user_id='me', format='metadata'):
+# service -> {msg_id: {(user_id, format, headers, fields): (fetched at, message)}};
+# a service's entries go away with it. Callers always get their own copy,
+# so mutating a returned message never changes the cached one.
+_MESSAGE_CACHE = weakref.WeakKeyDictionary()
+_MESSAGE_CACHE_LOCK = threading.Lock()
+
+def _message_cache_key(user_id, format, metadata_headers, fields):
+    """Key identifying one variant of a cached message fetch"""
+    return (user_id, format, tuple(metadata_headers or ()), fields)
+
+def _cached_message(service, msg_id, key):
+    """Get a copy of a cached message if it is still fresh, else None"""
+    with _MESSAGE_CACHE_LOCK:
+        entry = _MESSAGE_CACHE.get(service, {}).get(msg_id, {}).get(key)
+    if entry and time.monotonic() - entry[0] < MESSAGE_CACHE_TTL:
+        return copy.deepcopy(entry[1])
+    return None
+
+def _cache_message(service, msg_id, key, message):
+    """Remember a copy of a fetched message, evicting the oldest one when full"""
+    message = copy.deepcopy(message)
+    with _MESSAGE_CACHE_LOCK:
+        cache = _MESSAGE_CACHE.get(service)
+        if cache is None:
+            cache = _MESSAGE_CACHE[service] = {}
+        if msg_id not in cache and len(cache) >= MESSAGE_CACHE_SIZE:
+            del cache[next(iter(cache))]
+        cache.setdefault(msg_id, {})[key] = (time.monotonic(), message)
+
+def _invalidate_messages(service, msg_ids):
+    """Evict messages whose labels or existence just changed"""
+    with _MESSAGE_CACHE_LOCK:
+        cache = _MESSAGE_CACHE.get(service)
+        if cache is None:
+            return
+        for msg_id in msg_ids:
+            cache.pop(msg_id, None)
+
+@gmail_call('Error getting message {msg_id}')
+def get_message(service, msg_id, user_id='me', format='metadata', http=None, metadata_headers=None, fields=None):
     """
     Get a specific message by ID
     
@@ -74,23 +392,372 @@ def get_message(service, msg_id, user_id='me', format='metadata'):
         msg_id: The message ID
         user_id: User's email address (default: 'me')
         format: Format to return the message in ('full', 'metadata', 'minimal', 'raw')
+        http: Optional connection to use instead of the service's own
+            (required when calling from multiple threads)
+        metadata_headers: Optional list of headers to include when format is 'metadata'
+        fields: Optional partial-response mask, e.g. MESSAGE_METADATA_FIELDS
     
     Returns:
         The message data
     """
-    try:
-        message = service.users().messages().get(
-            userId=user_id, 
-            id=msg_id, 
-            format=format
-        ).execute()
+    cache_key = None
+    if format in CACHEABLE_FORMATS:
+        cache_key = _message_cache_key(user_id, format, metadata_headers, fields)
+        cached = _cached_message(service, msg_id, cache_key)
+        if cached is not None:
+            return cached
+    
+    params = {'userId': user_id, 'id': msg_id, 'format': format}
+    if metadata_headers:
+        params['metadataHeaders'] = metadata_headers
+    if fields:
+        params['fields'] = fields
+    
+    message = service.users().messages().get(**params).execute(http=http)
+    
+    if cache_key is not None:
+        _cache_message(service, msg_id, cache_key, message)
+    return message
+
+def _execute_batched(service, keys, make_request, kind):
+    """
+    Execute one GET per key using batched HTTP requests
+    
+    Args:
+        service: Gmail API service instance
+        keys: List of IDs to fetch; repeated IDs are fetched once
+        make_request: Callable returning the API request for an ID
+        kind: Resource name used in error messages, e.g. 'message'
+    
+    Returns:
+        List of responses in the same order as keys, with None for
+        items that could not be fetched
+    """
+    results = {}
+    
+    def callback(request_id, response, exception):
+        if exception is not None:
+            logger.error(f'Error getting {kind} {request_id}: {exception}')
+        else:
+            results[request_id] = response
+    
+    # Batch request IDs must be unique, and a repeated ID needs fetching only once
+    unique_keys = list(dict.fromkeys(keys))
+    
+    batches = []
+    for start in range(0, len(unique_keys), BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=callback)
+        for key in unique_keys[start:start + BATCH_SIZE]:
+            batch.add(make_request(key), request_id=key)
+        batches.append(batch)
+    
+    if len(batches) == 1:
+        _execute_batch(batches[0])
+    elif batches:
+        # httplib2 connections are not thread-safe, so each worker sends
+        # its batches over its own authorized connection
+        def execute_in_worker(batch):
+            _execute_batch(batch, http=thread_authorized_http(service))
         
-        return message
+        executor = _get_executor()
+        for future in [executor.submit(execute_in_worker, batch) for batch in batches]:
+            future.result()
+    
+    return [results.get(key) for key in keys]
+
+def _execute_batch(batch, http=None):
+    """
+    Execute a batch request, retrying with backoff when Gmail pushes back
     
+    Args:
+        batch: BatchHttpRequest to execute
+        http: Optional connection to send the batch over
+    """
+    for attempt in range(NUM_RETRIES + 1):
+        try:
+            batch.execute(http=http)
+            return
+        except HttpError as error:
+            if error.resp.status not in BATCH_RETRY_STATUSES or attempt == NUM_RETRIES:
+                raise
+            time.sleep(random.random() * 2 ** attempt)
+
+def get_messages_batch(service, msg_ids, user_id='me', format='metadata', metadata_headers=None, fields=None):
+    """
+    Get multiple messages by ID using batched HTTP requests
+    
+    Args:
+        service: Gmail API service instance
+        msg_ids: List of message IDs
+        user_id: User's email address (default: 'me')
+        format: Format to return the messages in ('full', 'metadata', 'minimal', 'raw')
+        metadata_headers: Optional list of headers to include when format is 'metadata'
+        fields: Optional partial-response mask, e.g. MESSAGE_METADATA_FIELDS
+    
+    Returns:
+        List of message data in the same order as msg_ids, with None for
+        messages that could not be fetched
+    """
+    params = {'userId': user_id, 'format': format}
+    if metadata_headers:
+        params['metadataHeaders'] = metadata_headers
+    if fields:
+        params['fields'] = fields
+    
+    messages = service.users().messages()
+    
+    def fetch(ids):
+        return _execute_batched(service, ids, lambda msg_id: messages.get(id=msg_id, **params), 'message')
+    
+    if format not in CACHEABLE_FORMATS:
+        return fetch(msg_ids)
+    
+    # Only fetch what isn't cached yet
+    cache_key = _message_cache_key(user_id, format, metadata_headers, fields)
+    results = [_cached_message(service, msg_id, cache_key) for msg_id in msg_ids]
+    missing = [msg_id for msg_id, msg in zip(msg_ids, results) if msg is None]
+    if not missing:
+        return results
+    
+    fetched = {}
+    for msg_id, msg in zip(missing, fetch(missing)):
+        if msg is not None:
+            fetched[msg_id] = msg
+            _cache_message(service, msg_id, cache_key, msg)
+    return [msg if msg is not None else fetched.get(msg_id) for msg_id, msg in zip(msg_ids, results)]
+
+class MicroBatcher:
+    """
+    Coalesce single-message fetches that arrive close together into batches
+    
+    A background thread collects submitted IDs until MICRO_BATCH_SIZE are
+    waiting or MICRO_BATCH_WAIT seconds have passed since the first one,
+    then fetches them all with one batch request. The batcher only holds a
+    weak reference to the service; its thread exits once close() is called
+    or the service is garbage collected.
+    """
+    
+    def __init__(self, service, user_id='me', format='metadata', metadata_headers=None, fields=None):
+        self._service = weakref.ref(service)
+        self.params = {'userId': user_id, 'format': format}
+        if metadata_headers:
+            self.params['metadataHeaders'] = metadata_headers
+        if fields:
+            self.params['fields'] = fields
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='gmail-micro-batcher', daemon=True)
+        self._thread.start()
+    
+    def submit(self, msg_id):
+        """
+        Queue a message fetch
+        
+        Args:
+            msg_id: The message ID
+        
+        Returns:
+            A Future resolving to the message data
+        """
+        future = Future()
+        if self._closed:
+            future.set_exception(RuntimeError('Micro-batcher is closed'))
+        else:
+            self._queue.put((msg_id, future))
+        return future
+    
+    def close(self):
+        """Stop the background thread once already queued fetches are done"""
+        self._closed = True
+        self._queue.put(None)
+    
+    def _collect(self):
+        """Block for the first request, then gather more until the window closes"""
+        pending = [self._queue.get()]
+        deadline = time.monotonic() + MICRO_BATCH_WAIT
+        while len(pending) < MICRO_BATCH_SIZE and pending[-1] is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return pending
+    
+    def _run(self):
+        while True:
+            pending = self._collect()
+            stop = pending[-1] is None
+            if stop:
+                pending.pop()
+            if pending:
+                self._fetch(pending)
+            if stop:
+                return
+    
+    def _fetch(self, pending):
+        """Fetch one collected group of messages with a single batch request"""
+        futures = {}
+        for msg_id, future in pending:
+            futures.setdefault(msg_id, []).append(future)
+        
+        def callback(request_id, response, exception):
+            for future in futures[request_id]:
+                if exception is not None:
+                    future.set_exception(exception)
+                else:
+                    future.set_result(response)
+        
+        error = None
+        try:
+            service = self._service()
+            if service is None:
+                raise RuntimeError('Gmail service was garbage collected')
+            messages = service.users().messages()
+            batch = service.new_batch_http_request(callback=callback)
+            for msg_id in futures:
+                batch.add(messages.get(id=msg_id, **self.params), request_id=msg_id)
+            _execute_batch(batch, http=thread_authorized_http(service))
+        except Exception as e:
+            error = e
+        
+        # Never leave a caller waiting on a message the batch did not answer
+        for msg_id, waiting in futures.items():
+            for future in waiting:
+                if not future.done():
+                    future.set_exception(error or RuntimeError(f'No response for message {msg_id}'))
+
+# Service -> {(user_id, format, headers, fields): MicroBatcher}; entries go
+# away with the service, and a finalizer stops their threads
+_MICRO_BATCHERS = weakref.WeakKeyDictionary()
+_MICRO_BATCHERS_LOCK = threading.Lock()
+
+def _close_batchers(batchers):
+    """Stop every batcher in a service's entry"""
+    for batcher in batchers.values():
+        batcher.close()
+
+def close_micro_batchers():
+    """Stop all micro-batcher threads, e.g. before discarding a service"""
+    with _MICRO_BATCHERS_LOCK:
+        for batchers in _MICRO_BATCHERS.values():
+            _close_batchers(batchers)
+        _MICRO_BATCHERS.clear()
+
+def get_message_batched(service, msg_id, user_id='me', format='metadata', metadata_headers=None, fields=None):
+    """
+    Get a message like get_message, sharing a batch request with concurrent callers
+    
+    Meant for code that fetches single messages from many threads at once;
+    each call may wait up to MICRO_BATCH_WAIT seconds for others to join.
+    
+    Args:
+        service: Gmail API service instance
+        msg_id: The message ID
+        user_id: User's email address (default: 'me')
+        format: Format to return the message in ('full', 'metadata', 'minimal', 'raw')
+        metadata_headers: Optional list of headers to include when format is 'metadata'
+        fields: Optional partial-response mask, e.g. MESSAGE_METADATA_FIELDS
+    
+    Returns:
+        The message data
+    
+    Raises:
+        TimeoutError: If no response arrived within MICRO_BATCH_TIMEOUT seconds
+    """
+    key = _message_cache_key(user_id, format, metadata_headers, fields)
+    if format in CACHEABLE_FORMATS:
+        cached = _cached_message(service, msg_id, key)
+        if cached is not None:
+            return cached
+    
+    with _MICRO_BATCHERS_LOCK:
+        batchers = _MICRO_BATCHERS.get(service)
+        if batchers is None:
+            batchers = _MICRO_BATCHERS[service] = {}
+            weakref.finalize(service, _close_batchers, batchers)
+        batcher = batchers.get(key)
+        if batcher is None:
+            batcher = batchers[key] = MicroBatcher(
+                service, user_id=user_id, format=format, metadata_headers=metadata_headers, fields=fields
+            )
+    
+    try:
+        message = batcher.submit(msg_id).result(timeout=MICRO_BATCH_TIMEOUT)
     except HttpError as error:
-        logger.error(f'Error getting message {msg_id}: {error}')
+        logger.error('Error getting message %s: %s', msg_id, error)
         raise
+    
+    if format in CACHEABLE_FORMATS:
+        _cache_message(service, msg_id, key, message)
+    return message
+
+def get_drafts_batch(service, draft_ids, user_id='me', format='full'):
+    """
+    Get multiple drafts by ID using batched HTTP requests
+    
+    Args:
+        service: Gmail API service instance
+        draft_ids: List of draft IDs
+        user_id: User's email address (default: 'me')
+        format: Format to return the draft messages in ('full', 'metadata', 'minimal', 'raw')
+    
+    Returns:
+        List of draft data in the same order as draft_ids, with None for
+        drafts that could not be fetched
+    """
+    drafts = service.users().drafts()
+    return _execute_batched(
+        service, draft_ids, lambda draft_id: drafts.get(userId=user_id, id=draft_id, format=format), 'draft'
+    )
+
+def get_threads_batch(service, thread_ids, user_id='me'):
+    """
+    Get multiple threads by ID using batched HTTP requests
+    
+    Args:
+        service: Gmail API service instance
+        thread_ids: List of thread IDs
+        user_id: User's email address (default: 'me')
+    
+    Returns:
+        List of thread data in the same order as thread_ids, with None for
+        threads that could not be fetched
+    """
+    threads = service.users().threads()
+    return _execute_batched(
+        service, thread_ids, lambda thread_id: threads.get(userId=user_id, id=thread_id), 'thread'
+    )
+
+def get_attachments_batch(service, message_id, attachment_ids, user_id='me'):
+    """
+    Get several attachments of a message using batched HTTP requests
+    
+    Args:
+        service: Gmail API service instance
+        message_id: The message ID
+        attachment_ids: List of attachment IDs
+        user_id: User's email address (default: 'me')
+    
+    Returns:
+        List of decoded attachment bytes in the same order as attachment_ids,
+        with None for attachments that could not be fetched
+    """
+    attachments = service.users().messages().attachments()
+    results = _execute_batched(
+        service,
+        attachment_ids,
+        lambda attachment_id: attachments.get(userId=user_id, messageId=message_id, id=attachment_id),
+        'attachment'
+    )
+    # Decode one at a time, dropping each encoded string as soon as it is done
+    for i, attachment in enumerate(results):
+        if attachment is not None:
+            results[i] = _b64.urlsafe_b64decode(attachment.pop('data'))
+    return results
 
+@gmail_call('Error searching messages', default=[])
 def search_messages(service, query, max_results=10, user_id='me'):
     """
     Search for messages matching a query
@@ -104,20 +771,21 @@ def search_messages(service, query, max_results=10, user_id='me'):
     Returns:
         List of message IDs matching the query
     """
-    try:
-        response = service.users().messages().list(
-            userId=user_id,
-            q=query,
-            maxResults=max_results
-        ).execute()
-        
-        messages = response.get('messages', [])
-        return [msg['id'] for msg in messages]
-    
-    except HttpError as error:
-        logger.error(f'Error searching messages: {error}')
-        return []
+    # A single page can't hold more; page through the rest
+    if max_results > MAX_PAGE_SIZE:
+        return list(iter_message_ids(service, query, user_id, limit=max_results))
+    
+    response = service.users().messages().list(
+        userId=user_id,
+        q=normalize_query(query),
+        maxResults=max_results,
+        fields=MESSAGE_LIST_FIELDS
+    ).execute()
+    
+    messages = response.get('messages', [])
+    return [msg['id'] for msg in messages]
 
+@gmail_call('Error listing drafts', default={'drafts': []})
 def list_drafts(service, max_results=10, user_id='me'):
     """
     List email drafts
@@ -130,19 +798,16 @@ def list_drafts(service, max_results=10, user_id='me'):
     Returns:
         List of draft data
     """
-    try:
-        response = service.users().drafts().list(
-            userId=user_id,
-            maxResults=max_results
-        ).execute()
-        
-        return response
+    response = service.users().drafts().list(
+        userId=user_id,
+        maxResults=max_results,
+        fields=DRAFT_LIST_FIELDS
+    ).execute()
     
-    except HttpError as error:
-        logger.error(f'Error listing drafts: {error}')
-        return {'drafts': []}
+    return response
 
-def get_draft(service, draft_id, user_id='me'):
+@gmail_call('Error getting draft {draft_id}', default=None)
+def get_draft(service, draft_id, user_id='me', format='full', http=None):
     """
     Get a specific draft by ID
     
@@ -150,22 +815,22 @@ def get_draft(service, draft_id, user_id='me'):
         service: Gmail API service instance
         draft_id: The draft ID
         user_id: User's email address (default: 'me')
+        format: Format to return the draft message in ('full', 'metadata', 'minimal', 'raw')
+        http: Optional connection to use instead of the service's own
+            (required when calling from multiple threads)
     
     Returns:
         The draft data
     """
-    try:
-        draft = service.users().drafts().get(
-            userId=user_id,
-            id=draft_id
-        ).execute()
-        
-        return draft
+    draft = service.users().drafts().get(
+        userId=user_id,
+        id=draft_id,
+        format=format
+    ).execute(http=http)
     
-    except HttpError as error:
-        logger.error(f'Error getting draft {draft_id}: {error}')
-        return None
+    return draft
 
+@gmail_call('Error creating draft')
 def create_draft(service, message, user_id='me'):
     """
     Create an email draft
@@ -178,18 +843,14 @@ def create_draft(service, message, user_id='me'):
     Returns:
         The created draft data
     """
-    try:
-        draft = service.users().drafts().create(
-            userId=user_id,
-            body={'message': message}
-        ).execute()
-        
-        return draft
+    draft = service.users().drafts().create(
+        userId=user_id,
+        body={'message': message}
+    ).execute()
     
-    except HttpError as error:
-        logger.error(f'Error creating draft: {error}')
-        raise
+    return draft
 
+@gmail_call('Error updating draft {draft_id}')
 def update_draft(service, draft_id, message, user_id='me'):
     """
     Update an existing draft
@@ -203,19 +864,15 @@ def update_draft(service, draft_id, message, user_id='me'):
     Returns:
         The updated draft data
     """
-    try:
-        draft = service.users().drafts().update(
-            userId=user_id,
-            id=draft_id,
-            body={'message': message}
-        ).execute()
-        
-        return draft
+    draft = service.users().drafts().update(
+        userId=user_id,
+        id=draft_id,
+        body={'message': message}
+    ).execute()
     
-    except HttpError as error:
-        logger.error(f'Error updating draft {draft_id}: {error}')
-        raise
+    return draft
 
+@gmail_call('Error sending message')
 def send_message(service, message, user_id='me'):
     """
     Send an email message
@@ -228,18 +885,14 @@ def send_message(service, message, user_id='me'):
     Returns:
         The sent message data
     """
-    try:
-        message = service.users().messages().send(
-            userId=user_id,
-            body=message
-        ).execute()
-        
-        return message
+    message = service.users().messages().send(
+        userId=user_id,
+        body=message
+    ).execute()
     
-    except HttpError as error:
-        logger.error(f'Error sending message: {error}')
-        raise
+    return message
 
+@gmail_call('Error deleting message {msg_id}')
 def delete_message(service, msg_id, user_id='me'):
     """
     Move a message to trash
@@ -249,18 +902,15 @@ def delete_message(service, msg_id, user_id='me'):
         msg_id: The message ID
         user_id: User's email address (default: 'me')
     """
-    try:
-        service.users().messages().trash(
-            userId=user_id,
-            id=msg_id
-        ).execute()
-        
-        return True
+    service.users().messages().trash(
+        userId=user_id,
+        id=msg_id
+    ).execute(num_retries=NUM_RETRIES)
+    _invalidate_messages(service, (msg_id,))
     
-    except HttpError as error:
-        logger.error(f'Error deleting message {msg_id}: {error}')
-        raise
+    return True
 
+@gmail_call('Error permanently deleting message {msg_id}')
 def permanently_delete_message(service, msg_id, user_id='me'):
     """
     Permanently delete a message (skipping trash)
@@ -270,18 +920,51 @@ def permanently_delete_message(service, msg_id, user_id='me'):
         msg_id: The message ID
         user_id: User's email address (default: 'me')
     """
-    try:
-        service.users().messages().delete(
+    service.users().messages().delete(
+        userId=user_id,
+        id=msg_id
+    ).execute()
+    _invalidate_messages(service, (msg_id,))
+    
+    return True
+
+def delete_messages_bulk(service, msg_ids, user_id='me'):
+    """
+    Move many messages to trash with batchModify
+    
+    Args:
+        service: Gmail API service instance
+        msg_ids: List of message IDs; split into requests of up to 1000
+        user_id: User's email address (default: 'me')
+    """
+    return batch_modify_messages(
+        service, msg_ids, {'addLabelIds': ['TRASH'], 'removeLabelIds': ['INBOX']}, user_id=user_id
+    )
+
+@gmail_call('Error permanently deleting messages')
+def permanently_delete_messages_bulk(service, msg_ids, user_id='me'):
+    """
+    Permanently delete many messages (skipping trash) with batchDelete
+    
+    Gmail only allows this with the full https://mail.google.com/ scope,
+    which utils.auth.SCOPES does not request.
+    
+    Args:
+        service: Gmail API service instance
+        msg_ids: List of message IDs; split into requests of up to 1000
+        user_id: User's email address (default: 'me')
+    """
+    for start in range(0, len(msg_ids), BATCH_MODIFY_SIZE):
+        chunk = msg_ids[start:start + BATCH_MODIFY_SIZE]
+        service.users().messages().batchDelete(
             userId=user_id,
-            id=msg_id
-        ).execute()
-        
-        return True
+            body={'ids': chunk}
+        ).execute(num_retries=NUM_RETRIES)
+        _invalidate_messages(service, chunk)
     
-    except HttpError as error:
-        logger.error(f'Error permanently deleting message {msg_id}: {error}')
-        raise
+    return True
 
+@gmail_call('Error modifying message {msg_id}')
 def modify_message(service, msg_id, modifications, user_id='me'):
     """
     Modify message labels
@@ -295,48 +978,73 @@ def modify_message(service, msg_id, modifications, user_id='me'):
     Returns:
         The modified message
     """
-    try:
-        result = service.users().messages().modify(
-            userId=user_id,
-            id=msg_id,
-            body=modifications
-        ).execute()
-        
-        return result
-    
-    except HttpError as error:
-        logger.error(f'Error modifying message {msg_id}: {error}')
-        raise
+    result = service.users().messages().modify(
+        userId=user_id,
+        id=msg_id,
+        body=modifications
+    ).execute(num_retries=NUM_RETRIES)
+    _invalidate_messages(service, (msg_id,))
+    
+    return result
 
+@gmail_call('Error batch modifying messages')
 def batch_modify_messages(service, msg_ids, modifications, user_id='me'):
     """
     Batch modify multiple messages' labels
     
     Args:
         service: Gmail API service instance
-        msg_ids: List of message IDs
+        msg_ids: List of message IDs; split into requests of up to 1000
         modifications: Dict with addLabelIds and/or removeLabelIds fields
         user_id: User's email address (default: 'me')
     """
-    try:
+    result = None
+    for start in range(0, len(msg_ids), BATCH_MODIFY_SIZE):
+        chunk = msg_ids[start:start + BATCH_MODIFY_SIZE]
         result = service.users().messages().batchModify(
             userId=user_id,
             body={
-                'ids': msg_ids,
+                'ids': chunk,
                 **modifications
             }
-        ).execute()
-        
-        return result
+        ).execute(num_retries=NUM_RETRIES)
+        _invalidate_messages(service, chunk)
     
-    except HttpError as error:
-        logger.error(f'Error batch modifying messages: {error}')
-        raise
+    return result
+
+# service -> {user_id: (fetched at, labels, labels by ID, label IDs by name,
+# labels by lowercase name)}; like the message cache, entries go away with
+# the service and callers always get their own copy
+_LABEL_CACHE = weakref.WeakKeyDictionary()
+_LABEL_CACHE_LOCK = threading.Lock()
+
+def _invalidate_label_cache(service, user_id='me'):
+    """Drop the cached label list after labels were created, changed or deleted"""
+    with _LABEL_CACHE_LOCK:
+        _LABEL_CACHE.get(service, {}).pop(user_id, None)
 
+def _cached_labels(service, user_id='me'):
+    """
+    Get the cached label list entry if it is still fresh
+    
+    Returns:
+        Tuple of (labels, labels by ID, label IDs by name, labels by lowercase
+        name), or None on a miss
+    """
+    with _LABEL_CACHE_LOCK:
+        entry = _LABEL_CACHE.get(service, {}).get(user_id)
+    if entry and time.monotonic() - entry[0] < LABEL_CACHE_TTL:
+        return entry[1:]
+    return None
+
+@gmail_call('Error getting labels', default=[])
 def get_labels(service, user_id='me'):
     """
     Get all labels for a user
     
+    The list is cached for LABEL_CACHE_TTL seconds and dropped whenever a
+    label is created, updated or deleted through this module.
+    
     Args:
         service: Gmail API service instance
         user_id: User's email address (default: 'me')
@@ -344,15 +1052,28 @@ def get_labels(service, user_id='me'):
     Returns:
         List of label objects
     """
-    try:
-        response = service.users().labels().list(userId=user_id).execute()
-        return response.get('labels', [])
-    
-    except HttpError as error:
-        logger.error(f'Error getting labels: {error}')
-        return []
+    cached = _cached_labels(service, user_id)
+    if cached:
+        return copy.deepcopy(cached[0])
+    
+    response = service.users().labels().list(userId=user_id).execute()
+    labels = response.get('labels', [])
+    # An empty list usually means the request failed; don't cache it
+    if labels:
+        cached = copy.deepcopy(labels)
+        entry = (
+            time.monotonic(),
+            cached,
+            {label['id']: label for label in cached},
+            {label['name']: label['id'] for label in cached},
+            {label['name'].lower(): label for label in cached}
+        )
+        with _LABEL_CACHE_LOCK:
+            _LABEL_CACHE.setdefault(service, {})[user_id] = entry
+    return labels
 
-def get_label(service, label_id, user_id='me'):
+@gmail_call('Error getting label {label_id}', default=None)
+def get_label(service, label_id, user_id='me', use_cache=True):
     """
     Get a specific label by ID
     
@@ -360,22 +1081,68 @@ def get_label(service, label_id, user_id='me'):
         service: Gmail API service instance
         label_id: The label ID
         user_id: User's email address (default: 'me')
+        use_cache: Serve the label from a fresh cached label list when
+            possible; entries from the list carry no message counts, so
+            pass False when those are needed
     
     Returns:
         The label object
     """
-    try:
-        label = service.users().labels().get(
-            userId=user_id,
-            id=label_id
-        ).execute()
-        
-        return label
+    if use_cache:
+        cached = _cached_labels(service, user_id)
+        if cached and label_id in cached[1]:
+            return copy.deepcopy(cached[1][label_id])
     
-    except HttpError as error:
-        logger.error(f'Error getting label {label_id}: {error}')
-        return None
+    label = service.users().labels().get(
+        userId=user_id,
+        id=label_id
+    ).execute()
+    
+    return label
 
+def get_label_map(service, user_id='me'):
+    """
+    Get a mapping of label names to IDs
+    
+    Built from the cached label list, so translating names to IDs costs no
+    requests once the list has been fetched.
+    
+    Args:
+        service: Gmail API service instance
+        user_id: User's email address (default: 'me')
+    
+    Returns:
+        Dict of label name to label ID
+    """
+    labels = get_labels(service, user_id)
+    cached = _cached_labels(service, user_id)
+    if cached:
+        return dict(cached[2])
+    # The list could not be cached (e.g. it came back empty)
+    return {label['name']: label['id'] for label in labels}
+
+def find_label(service, name, user_id='me'):
+    """
+    Look up a label by name, ignoring case
+    
+    Served from the cached label list, like get_label_map.
+    
+    Args:
+        service: Gmail API service instance
+        name: The label name
+        user_id: User's email address (default: 'me')
+    
+    Returns:
+        The label object, or None if there is no such label
+    """
+    labels = get_labels(service, user_id)
+    cached = _cached_labels(service, user_id)
+    if cached:
+        return copy.deepcopy(cached[3].get(name.lower()))
+    # The list could not be cached (e.g. it came back empty)
+    return next((label for label in labels if label['name'].lower() == name.lower()), None)
+
+@gmail_call('Error creating label {name}')
 def create_label(service, name, user_id='me'):
     """
     Create a new label
@@ -388,22 +1155,19 @@ def create_label(service, name, user_id='me'):
     Returns:
         The created label object
     """
-    try:
-        label = service.users().labels().create(
-            userId=user_id,
-            body={
-                'name': name,
-                'labelListVisibility': 'labelShow',
-                'messageListVisibility': 'show'
-            }
-        ).execute()
-        
-        return label
+    label = service.users().labels().create(
+        userId=user_id,
+        body={
+            'name': name,
+            'labelListVisibility': 'labelShow',
+            'messageListVisibility': 'show'
+        }
+    ).execute()
+    _invalidate_label_cache(service, user_id)
     
-    except HttpError as error:
-        logger.error(f'Error creating label {name}: {error}')
-        raise
+    return label
 
+@gmail_call('Error updating label {label_id}')
 def update_label(service, label_id, updates, user_id='me'):
     """
     Update an existing label
@@ -417,19 +1181,16 @@ def update_label(service, label_id, updates, user_id='me'):
     Returns:
         The updated label object
     """
-    try:
-        label = service.users().labels().patch(
-            userId=user_id,
-            id=label_id,
-            body=updates
-        ).execute()
-        
-        return label
-    
-    except HttpError as error:
-        logger.error(f'Error updating label {label_id}: {error}')
-        raise
+    label = service.users().labels().patch(
+        userId=user_id,
+        id=label_id,
+        body=updates
+    ).execute()
+    _invalidate_label_cache(service, user_id)
+    
+    return label
 
+@gmail_call('Error deleting label {label_id}')
 def delete_label(service, label_id, user_id='me'):
     """
     Delete a label
@@ -439,65 +1200,86 @@ def delete_label(service, label_id, user_id='me'):
         label_id: The ID of the label to delete
         user_id: User's email address (default: 'me')
     """
-    try:
-        service.users().labels().delete(
-            userId=user_id,
-            id=label_id
-        ).execute()
-        
-        return True
+    service.users().labels().delete(
+        userId=user_id,
+        id=label_id
+    ).execute()
+    _invalidate_label_cache(service, user_id)
     
-    except HttpError as error:
-        logger.error(f'Error deleting label {label_id}: {error}')
-        raise
+    return True
 
+@gmail_call('Error applying label {label_id} to message {msg_id}')
 def apply_label(service, msg_id, label_id, user_id='me'):
     """
     Apply a label to a message
     
+    For several messages use apply_label_bulk, which needs one request
+    per 1000 messages instead of one per message.
+    
     Args:
         service: Gmail API service instance
         msg_id: The message ID
         label_id: The label ID
         user_id: User's email address (default: 'me')
     """
-    try:
-        result = service.users().messages().modify(
-            userId=user_id,
-            id=msg_id,
-            body={'addLabelIds': [label_id]}
-        ).execute()
-        
-        return result
-    
-    except HttpError as error:
-        logger.error(f'Error applying label {label_id} to message {msg_id}: {error}')
-        raise
+    result = service.users().messages().modify(
+        userId=user_id,
+        id=msg_id,
+        body={'addLabelIds': [label_id]}
+    ).execute(num_retries=NUM_RETRIES)
+    _invalidate_messages(service, (msg_id,))
+    
+    return result
 
+@gmail_call('Error removing label {label_id} from message {msg_id}')
 def remove_label(service, msg_id, label_id, user_id='me'):
     """
     Remove a label from a message
     
+    For several messages use remove_label_bulk, which needs one request
+    per 1000 messages instead of one per message.
+    
     Args:
         service: Gmail API service instance
         msg_id: The message ID
         label_id: The label ID
         user_id: User's email address (default: 'me')
     """
-    try:
-        result = service.users().messages().modify(
-            userId=user_id,
-            id=msg_id,
-            body={'removeLabelIds': [label_id]}
-        ).execute()
-        
-        return result
+    result = service.users().messages().modify(
+        userId=user_id,
+        id=msg_id,
+        body={'removeLabelIds': [label_id]}
+    ).execute(num_retries=NUM_RETRIES)
+    _invalidate_messages(service, (msg_id,))
+    
+    return result
+
+def apply_label_bulk(service, msg_ids, label_id, user_id='me'):
+    """
+    Apply a label to many messages with batchModify
     
-    except HttpError as error:
-        logger.error(f'Error removing label {label_id} from message {msg_id}: {error}')
-        raise
+    Args:
+        service: Gmail API service instance
+        msg_ids: List of message IDs; split into requests of up to 1000
+        label_id: The label ID
+        user_id: User's email address (default: 'me')
+    """
+    return batch_modify_messages(service, msg_ids, {'addLabelIds': [label_id]}, user_id=user_id)
 
-def get_thread(service, thread_id, user_id='me'):
+def remove_label_bulk(service, msg_ids, label_id, user_id='me'):
+    """
+    Remove a label from many messages with batchModify
+    
+    Args:
+        service: Gmail API service instance
+        msg_ids: List of message IDs; split into requests of up to 1000
+        label_id: The label ID
+        user_id: User's email address (default: 'me')
+    """
+    return batch_modify_messages(service, msg_ids, {'removeLabelIds': [label_id]}, user_id=user_id)
+
+@gmail_call('Error getting thread {thread_id}', default=None)
+def get_thread(service, thread_id, user_id='me', http=None):
     """
     Get a thread by ID
     
@@ -505,22 +1287,20 @@ def get_thread(service, thread_id, user_id='me'):
         service: Gmail API service instance
         thread_id: The thread ID
         user_id: User's email address (default: 'me')
+        http: Optional connection to use instead of the service's own
+            (required when calling from multiple threads)
     
     Returns:
         The thread data
     """
-    try:
-        thread = service.users().threads().get(
-            userId=user_id,
-            id=thread_id
-        ).execute()
-        
-        return thread
+    thread = service.users().threads().get(
+        userId=user_id,
+        id=thread_id
+    ).execute(http=http)
     
-    except HttpError as error:
-        logger.error(f'Error getting thread {thread_id}: {error}')
-        return None
+    return thread
 
+@gmail_call('Error listing threads', default=[])
 def list_threads(service, query=None, max_results=10, user_id='me'):
     """
     List email threads
@@ -534,24 +1314,50 @@ def list_threads(service, query=None, max_results=10, user_id='me'):
     Returns:
         List of thread data
     """
-    try:
-        params = {
-            'userId': user_id,
-            'maxResults': max_results
-        }
+    # A single page can't hold more; page through the rest
+    if max_results > MAX_PAGE_SIZE:
+        return list(iter_threads(service, query, user_id, limit=max_results))
+    
+    params = {
+        'userId': user_id,
+        'maxResults': max_results
+    }
+    
+    if query:
+        params['q'] = normalize_query(query)
         
+    response = service.users().threads().list(**params).execute()
+    
+    return response.get('threads', [])
+
+def iter_threads(service, query=None, user_id='me', page_size=MAX_PAGE_SIZE, limit=None):
+    """
+    Iterate over all threads matching a query, page by page
+    
+    Args:
+        service: Gmail API service instance
+        query: Optional search query
+        user_id: User's email address (default: 'me')
+        page_size: Number of threads requested per page
+        limit: Optional maximum number of threads to yield
+    
+    Yields:
+        Thread data; stop iterating to stop fetching pages
+    """
+    threads = service.users().threads()
+    
+    def make_request(page_token, page_size):
+        params = {'userId': user_id, 'maxResults': page_size}
         if query:
-            params['q'] = query
-            
-        response = service.users().threads().list(**params).execute()
-        
-        return response.get('threads', [])
+            params['q'] = normalize_query(query)
+        if page_token:
+            params['pageToken'] = page_token
+        return threads.list(**params)
     
-    except HttpError as error:
-        logger.error(f'Error listing threads: {error}')
-        return []
+    yield from _iter_pages(service, make_request, 'threads', page_size, limit)
 
-def get_attachment(service, message_id, attachment_id, user_id='me'):
+@gmail_call('Error getting attachment {attachment_id} from message {message_id}', default=None)
+def get_attachment(service, message_id, attachment_id, user_id='me', http=None):
     """
     Get an attachment by ID
     
@@ -560,27 +1366,51 @@ def get_attachment(service, message_id, attachment_id, user_id='me'):
         message_id: The message ID
         attachment_id: The attachment ID
         user_id: User's email address (default: 'me')
+        http: Optional connection to use instead of the service's own
+            (required when calling from multiple threads)
     
     Returns:
         The attachment data
     """
-    try:
-        attachment = service.users().messages().attachments().get(
-            userId=user_id,
-            messageId=message_id,
-            id=attachment_id
-        ).execute()
-        
-        # The attachment is base64 encoded
-        data = attachment['data']
-        file_data = base64.urlsafe_b64decode(data)
-        
-        return file_data
+    attachment = service.users().messages().attachments().get(
+        userId=user_id,
+        messageId=message_id,
+        id=attachment_id
+    ).execute(http=http)
+    
+    # The attachment is base64 encoded; take the string out of the response
+    # so it is freed right after decoding rather than living alongside the
+    # decoded bytes
+    return _b64.urlsafe_b64decode(attachment.pop('data'))
+
+def get_attachment_from_message(service, message, attachment_id, user_id='me'):
+    """
+    Get an attachment of an already fetched message
     
-    except HttpError as error:
-        logger.error(f'Error getting attachment {attachment_id} from message {message_id}: {error}')
-        return None
+    Small attachments of a format='full' message carry their data inline,
+    so they are decoded directly; only attachments stored out of band are
+    fetched with get_attachment.
+    
+    Args:
+        service: Gmail API service instance
+        message: Message fetched with format='full'
+        attachment_id: The attachment ID, or the part ID of an inline part
+        user_id: User's email address (default: 'me')
+    
+    Returns:
+        The attachment data, or None if it could not be fetched
+    """
+    stack = [message.get('payload', {})]
+    while stack:
+        part = stack.pop()
+        body = part.get('body', {})
+        if attachment_id in (body.get('attachmentId'), part.get('partId')) and body.get('data'):
+            return _b64.urlsafe_b64decode(body['data'])
+        stack.extend(part.get('parts', ()))
+    
+    return get_attachment(service, message['id'], attachment_id, user_id=user_id)
 
+@gmail_call('Error importing message')
 def import_message(service, message_content, user_id='me'):
     """
     Import a message directly into a mailbox
@@ -593,26 +1423,59 @@ def import_message(service, message_content, user_id='me'):
     Returns:
         The imported message data
     """
-    try:
-        # Ensure message_content is base64 encoded
-        if isinstance(message_content, str):
-            message_content = message_content.encode('utf-8')
-            
-        encoded_message = base64.urlsafe_b64encode(message_content).decode('utf-8')
-        
-        result = service.users().messages().import_(
-            userId=user_id,
-            body={
-                'raw': encoded_message
-            }
-        ).execute()
+    # Ensure message_content is base64 encoded
+    if isinstance(message_content, str):
+        message_content = message_content.encode('utf-8')
         
-        return result
+    # Base64 output is pure ASCII, so the cheaper ASCII codec is enough
+    encoded_message = _b64.urlsafe_b64encode(message_content).decode('ascii')
     
-    except HttpError as error:
-        logger.error(f'Error importing message: {error}')
-        raise
+    result = service.users().messages().import_(
+        userId=user_id,
+        body={
+            'raw': encoded_message
+        }
+    ).execute()
+    
+    return result
+
+def _fold_addresses(name, addresses):
+    """Join encoded addresses, folding between them to keep lines short"""
+    folded = []
+    line_length = len(name) + 2
+    for address in addresses:
+        if folded and line_length + len(address) + 2 > FOLD_LINE_LENGTH:
+            folded.append(',\r\n ')
+            line_length = 1
+        elif folded:
+            folded.append(', ')
+            line_length += 2
+        folded.append(address)
+        line_length += len(address)
+    return ''.join(folded)
+
+def encode_header(name, value):
+    """
+    Encode a header value for a hand-built message
+    
+    Args:
+        name: The header name, e.g. 'To' or 'Subject'
+        value: The header value
+    
+    Returns:
+        The value as ASCII, folded with CRLF if it is long
+    """
+    # Never allow a value to start a new header
+    value = value.replace('\r', ' ').replace('\n', ' ')
+    if value.isascii() and len(name) + len(value) + 2 <= MAX_LINE_LENGTH:
+        return value
+    if name in _ADDRESS_HEADERS:
+        addresses = [formataddr((n, a), charset='utf-8') for n, a in getaddresses([value])]
+        return _fold_addresses(name, addresses)
+    # Long lines are folded; match the CRLF line endings of the rest of the message
+    return Header(value, 'utf-8', header_name=name).encode(linesep='\r\n')
 
+@gmail_call('Error forwarding message {message_id}')
 def forward_message(service, message_id, to, user_id='me'):
     """
     Forward a message to another recipient
@@ -626,29 +1489,49 @@ def forward_message(service, message_id, to, user_id='me'):
     Returns:
         The sent message data
     """
-    try:
-        # Get the original message
-        message = get_message(service, message_id, user_id=user_id, format='raw')
-        
-        # Decode the raw message
-        raw_message = base64.urlsafe_b64decode(message['raw']).decode('utf-8')
-        
-        # Create a MIMEText with the forwarded message
-        forward = MIMEText(raw_message, 'rfc822')
-        forward['To'] = to
-        forward['Subject'] = f"Fwd: {get_message_subject(message)}"
-        
-        # Encode the message
-        encoded_message = base64.urlsafe_b64encode(forward.as_string().encode('utf-8')).decode('utf-8')
-        
-        # Send the forwarded message
-        result = send_message(service, {'raw': encoded_message}, user_id=user_id)
-        
-        return result
+    # Get the original message
+    message = get_message(service, message_id, user_id=user_id, format='raw')
     
-    except HttpError as error:
-        logger.error(f'Error forwarding message {message_id}: {error}')
-        raise
+    # Decode the raw message; it is forwarded as-is, without a
+    # round trip through str
+    raw_bytes = _b64.urlsafe_b64decode(message['raw'])
+    
+    # A raw-format message has no payload headers, so read the subject
+    # from the message itself rather than fetching it a second time
+    subject = BytesHeaderParser().parsebytes(raw_bytes).get('Subject')
+    subject = f"Fwd: {make_header(decode_header(subject))}" if subject else "Fwd: No Subject"
+    
+    # Wrap the original message as a message/rfc822 part
+    forward = bytearray()
+    forward += (f"To: {encode_header('To', to)}\r\n"
+                f"Subject: {encode_header('Subject', subject)}\r\n").encode('ascii')
+    forward += b'MIME-Version: 1.0\r\nContent-Type: message/rfc822\r\n\r\n'
+    forward += raw_bytes
+    
+    encoded_message = _b64.urlsafe_b64encode(forward).decode('ascii')
+    
+    # Send the forwarded message
+    result = send_message(service, {'raw': encoded_message}, user_id=user_id)
+    
+    return result
+
+def extract_headers(message, names=None):
+    """
+    Index a message's headers by lowercase name in a single pass
+    
+    Args:
+        message: The message object
+        names: Optional iterable of header names to keep (case-insensitive)
+    
+    Returns:
+        Dict of lowercase header name to value; the first occurrence wins
+    """
+    headers = reversed(message.get('payload', {}).get('headers', ()))
+    if names is None:
+        return {h['name'].lower(): h['value'] for h in headers}
+    
+    wanted = {name.lower() for name in names}
+    return {key: h['value'] for h in headers if (key := h['name'].lower()) in wanted}
 
 def get_message_subject(message):
     """
@@ -660,9 +1543,51 @@ def get_message_subject(message):
     Returns:
         The subject string
     """
-    if 'payload' in message and 'headers' in message['payload']:
-        for header in message['payload']['headers']:
-            if header['name'].lower() == 'subject':
-                return header['value']
+    return extract_headers(message, ('subject',)).get('subject', "No Subject")
+
+# Concurrency limit for the async helpers, one semaphore per event loop
+_ASYNC_SEMAPHORES = weakref.WeakKeyDictionary()
+
+async def _run_in_thread(func, service, *args, **kwargs):
+    """
+    Run a blocking helper in a worker thread without blocking the event loop
     
-    return "No Subject"
+    The call goes over the worker thread's own authorized connection, and
+    at most ASYNC_CONCURRENCY calls run at once.
+    
+    Args:
+        func: Helper taking the service first and an http keyword argument
+        service: Gmail API service instance
+    
+    Returns:
+        Whatever func returns
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _ASYNC_SEMAPHORES.get(loop)
+    if semaphore is None:
+        semaphore = _ASYNC_SEMAPHORES[loop] = asyncio.Semaphore(ASYNC_CONCURRENCY)
+    
+    def call():
+        return func(service, *args, http=thread_authorized_http(service), **kwargs)
+    
+    async with semaphore:
+        return await asyncio.to_thread(call)
+
+async def aget_message(service, msg_id, user_id='me', format='metadata', metadata_headers=None, fields=None):
+    """Async variant of get_message; use asyncio.gather to fetch several at once"""
+    return await _run_in_thread(
+        get_message, service, msg_id,
+        user_id=user_id, format=format, metadata_headers=metadata_headers, fields=fields
+    )
+
+async def aget_draft(service, draft_id, user_id='me', format='full'):
+    """Async variant of get_draft"""
+    return await _run_in_thread(get_draft, service, draft_id, user_id=user_id, format=format)
+
+async def aget_thread(service, thread_id, user_id='me'):
+    """Async variant of get_thread"""
+    return await _run_in_thread(get_thread, service, thread_id, user_id=user_id)
+
+async def aget_attachment(service, message_id, attachment_id, user_id='me'):
+    """Async variant of get_attachment"""
+    return await _run_in_thread(get_attachment, service, message_id, attachment_id, user_id=user_id)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+HTTP/2 Transport for the Gmail API Client
+
+googleapiclient talks to an httplib2-style object, and httplib2 speaks only
+HTTP/1.1, so concurrent requests each hold their own connection. This module
+provides a drop-in replacement backed by a shared httpx client with HTTP/2
+enabled, letting requests from every thread multiplex over one connection.
+
+It is opt-in (GMAIL_HTTP2=true) and needs the optional httpx[http2] extra.
+"""
+
+import os
+import logging
+import threading
+import httplib2
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Set up logging
+logger = logging.getLogger("gmail_transport")
+
+# Connection limits for the shared HTTP/2 client
+HTTP2_MAX_CONNECTIONS = 20
+HTTP2_MAX_KEEPALIVE_CONNECTIONS = 10
+
+# One client per process; httpx clients are thread-safe
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+def http2_enabled():
+    """
+    Check whether the HTTP/2 transport was requested and can be used
+
+    Returns:
+        True if GMAIL_HTTP2 is set and httpx with HTTP/2 support is installed
+    """
+    if os.environ.get('GMAIL_HTTP2', '').lower() not in ('1', 'true', 'yes'):
+        return False
+    if httpx is None:
+        logger.warning("GMAIL_HTTP2 is set but httpx is not installed; using HTTP/1.1")
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("GMAIL_HTTP2 is set but h2 is not installed; using HTTP/1.1")
+        return False
+    return True
+
+def _get_client(timeout):
+    """Get the process-wide HTTP/2 client, creating it on first use"""
+    global _CLIENT
+
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = httpx.Client(
+                http2=True,
+                timeout=timeout,
+                limits=httpx.Limits(
+                    max_connections=HTTP2_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP2_MAX_KEEPALIVE_CONNECTIONS
+                )
+            )
+        return _CLIENT
+
+# Headers describing the body as sent on the wire; httpx returns it decoded
+_DROPPED_RESPONSE_HEADERS = frozenset(('content-encoding', 'content-length'))
+
+class Http2TimeoutError(httplib2.HttpLib2Error, TimeoutError):
+    """A request timed out; retried by googleapiclient like a socket timeout"""
+
+class Http2ConnectionError(httplib2.HttpLib2Error, ConnectionError):
+    """A request failed at the transport level"""
+
+class Http2Transport:
+    """
+    httplib2.Http look-alike that sends requests through a shared httpx client
+
+    Only the parts googleapiclient and google_auth_httplib2 use are provided:
+    request(), timeout, connections and close().
+    """
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+        self.connections = {}
+        self._client = _get_client(timeout)
+
+    def request(self, uri, method='GET', body=None, headers=None,
+                redirections=httplib2.DEFAULT_MAX_REDIRECTS, connection_type=None):
+        """
+        Perform a request the way httplib2.Http.request does
+
+        Returns:
+            Tuple of (httplib2.Response, content bytes)
+        """
+        try:
+            response = self._client.request(
+                method,
+                uri,
+                content=body,
+                headers=headers,
+                follow_redirects=redirections > 0
+            )
+        except httpx.TimeoutException as e:
+            # Both types are httplib2 errors, which google-auth turns into a
+            # TransportError during refresh, and socket-style errors, which
+            # googleapiclient retries
+            raise Http2TimeoutError(str(e)) from e
+        except httpx.TransportError as e:
+            raise Http2ConnectionError(str(e)) from e
+
+        # httpx has already decompressed the body, so the headers describing
+        # the encoded body no longer apply
+        info = {
+            name: value for name, value in response.headers.items()
+            if name not in _DROPPED_RESPONSE_HEADERS
+        }
+        info['status'] = str(response.status_code)
+        return httplib2.Response(info), response.content
+
+    def close(self):
+        """The shared client stays open for other transports"""
+        pass